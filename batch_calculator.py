@@ -0,0 +1,141 @@
+# batch_calculator.py
+# Batch arithmetic for BuggyCalculator: masked safe division and vectorized memory accumulation
+
+import math
+import numbers
+import random
+import time
+from typing import List, NamedTuple, Sequence, Union
+
+from buggy_code import BuggyCalculator
+from calc_history import HistoryCalculator
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; batch methods fall back to pure Python
+    np = None
+
+Operand = Union[float, Sequence[float]]
+
+# Exact types that can be summed without a per-item numbers.Real check
+_PLAIN_NUMBERS = frozenset((int, float, bool))
+
+
+class DivideResult(NamedTuple):
+    values: Sequence[float]     # quotient, or ``fill`` where the divisor was zero
+    zero_mask: Sequence[bool]   # True where the divisor was zero
+
+
+class AccumulateResult(NamedTuple):
+    memory: float
+    accepted: int
+    rejected: List[int]         # positions of non-numeric values that were skipped
+
+
+def _fsum(values) -> float:
+    """math.fsum with NumPy's results where fsum raises: inf + -inf is NaN, overflow is inf."""
+    try:
+        return math.fsum(values)
+    except ValueError:
+        return math.nan
+    except OverflowError:
+        return float(sum(values))
+
+
+def _broadcast(a: Operand, b: Operand):
+    a_scalar = not hasattr(a, '__len__')
+    b_scalar = not hasattr(b, '__len__')
+    if a_scalar and b_scalar:
+        return [a], [b]
+    if a_scalar:
+        return [a] * len(b), b
+    if b_scalar:
+        return a, [b] * len(a)
+    if len(a) != len(b):
+        raise ValueError("Operands must have the same length")
+    return a, b
+
+
+class BatchCalculator(HistoryCalculator):
+    """HistoryCalculator with array-at-a-time ``divide_many`` and ``accumulate_many``."""
+
+    def divide_many(self, a: Operand, b: Operand, fill: float = math.nan, record: bool = False) -> DivideResult:
+        """Element-wise a / b; zero divisors yield ``fill`` and are flagged instead of raising.
+
+        Scalars broadcast against sequences. Returns ndarrays with NumPy, lists otherwise.
+        ``record`` appends the quotients to the history.
+        """
+        if np is not None:
+            a_arr = np.asarray(a, dtype=float)
+            b_arr = np.asarray(b, dtype=float)
+            a_arr, b_arr = np.broadcast_arrays(np.atleast_1d(a_arr), np.atleast_1d(b_arr))
+            zero_mask = b_arr == 0
+            values = np.full(a_arr.shape, fill, dtype=float)
+            np.divide(a_arr, b_arr, out=values, where=~zero_mask)
+        else:
+            a_seq, b_seq = _broadcast(a, b)
+            values = [x / y if y else fill for x, y in zip(a_seq, b_seq)]
+            zero_mask = [not y for y in b_seq]
+        if record:
+            self.history.extend(v for v, zero in zip(values, zero_mask) if not zero)
+        return DivideResult(values, zero_mask)
+
+    def accumulate_many(self, values) -> AccumulateResult:
+        """Add every real value to memory; other entries (including complex) are skipped and reported."""
+        # Bool, integer and float arrays only; complex and object arrays take the per-item path
+        if np is not None and isinstance(values, np.ndarray) and values.dtype.kind in 'biuf':
+            self.memory += float(values.sum())
+            return AccumulateResult(self.memory, int(values.size), [])
+        values = values if isinstance(values, (list, tuple)) else list(values)
+        if _PLAIN_NUMBERS.issuperset(map(type, values)):
+            self.memory += _fsum(values)
+            return AccumulateResult(self.memory, len(values), [])
+        accepted = []
+        rejected = []
+        for position, value in enumerate(values):
+            if isinstance(value, numbers.Real):
+                accepted.append(value)
+            else:
+                rejected.append(position)
+        self.memory += _fsum(accepted)
+        return AccumulateResult(self.memory, len(accepted), rejected)
+
+
+def benchmark_per_call_overhead(size: int = 1_000_000) -> None:
+    """Nanoseconds per operation for scalar calls versus the batch methods."""
+    rng = random.Random(9)
+    numerators = [rng.uniform(-1e3, 1e3) for _ in range(size)]
+    divisors = [0.0 if i % 50 == 0 else rng.uniform(-10, 10) for i in range(size)]
+
+    scalar = BuggyCalculator()
+    start = time.perf_counter()
+    for x, y in zip(numerators, divisors):
+        try:
+            scalar.divide(x, y)
+        except ZeroDivisionError:
+            pass
+    per_call_divide = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for x in numerators:
+        scalar.add_to_memory(x)
+    per_call_memory = time.perf_counter() - start
+
+    batch = BatchCalculator()
+    if np is not None:
+        numerators, divisors = np.array(numerators), np.array(divisors)
+    start = time.perf_counter()
+    batch.divide_many(numerators, divisors)
+    batch_divide = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch.accumulate_many(numerators)
+    batch_memory = time.perf_counter() - start
+
+    for label, seconds in (('divide per call', per_call_divide), ('divide_many', batch_divide),
+                           ('add_to_memory per call', per_call_memory), ('accumulate_many', batch_memory)):
+        print(f"{label:>24}: {seconds / size * 1e9:8.1f} ns/op")
+
+
+if __name__ == "__main__":
+    benchmark_per_call_overhead()
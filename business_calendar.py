@@ -0,0 +1,195 @@
+# business_calendar.py
+# Closed-form and holiday-aware business-day arithmetic (replacement for add_business_days)
+
+import datetime
+import os
+import random
+import time
+from array import array
+from bisect import bisect_left
+from functools import lru_cache
+from typing import FrozenSet, Iterable, List, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; array APIs fall back to bisect
+    np = None
+
+DEFAULT_START = datetime.date(1900, 1, 1)
+DEFAULT_END = datetime.date(2200, 12, 31)
+
+
+def add_business_days(start: datetime.date, days: int) -> datetime.date:
+    """Closed-form Mon-Fri arithmetic; same results as stepping one day at a time.
+
+    A weekend start behaves like the preceding Friday (forward) or the
+    following Monday (backward).
+    """
+    if days == 0:
+        return start
+    weekday = start.weekday()
+    if days > 0:
+        if weekday >= 5:
+            start -= datetime.timedelta(days=weekday - 4)
+            weekday = 4
+        weeks, rest = divmod(days, 5)
+        extra = 2 if weekday + rest >= 5 else 0
+        return start + datetime.timedelta(days=weeks * 7 + rest + extra)
+    if weekday >= 5:
+        start += datetime.timedelta(days=7 - weekday)
+        weekday = 0
+    weeks, rest = divmod(-days, 5)
+    extra = 2 if weekday - rest < 0 else 0
+    return start - datetime.timedelta(days=weeks * 7 + rest + extra)
+
+
+def _weekdays_through(ordinal: int) -> int:
+    # Mon-Fri days in [1, ordinal]; ordinal 1 (0001-01-01) was a Monday
+    weeks, rest = divmod(ordinal, 7)
+    return weeks * 5 + min(rest, 5)
+
+
+def business_days_between(start: datetime.date, end: datetime.date) -> int:
+    """Mon-Fri days in (start, end]; negative when ``end`` precedes ``start``."""
+    return _weekdays_through(end.toordinal()) - _weekdays_through(start.toordinal())
+
+
+@lru_cache(maxsize=32)
+def _load_holidays(path: str, mtime_ns: int) -> FrozenSet[datetime.date]:
+    holidays = set()
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if line:
+                holidays.add(datetime.date.fromisoformat(line))
+    return frozenset(holidays)
+
+
+def load_holidays(path: str) -> FrozenSet[datetime.date]:
+    """Read ISO dates (one per line, ``#`` comments); cached until the file changes."""
+    return _load_holidays(os.path.abspath(path), os.stat(path).st_mtime_ns)
+
+
+class BusinessCalendar:
+    """Holiday-aware calendar backed by a cumulative business-day index.
+
+    ``index[i]`` counts business days from ``start`` through ``start + i``,
+    so counting is a subtraction and adding business days is one bisect.
+    """
+
+    def __init__(self, holidays: Iterable[datetime.date] = (), start: datetime.date = DEFAULT_START,
+                 end: datetime.date = DEFAULT_END):
+        if end < start:
+            raise ValueError("end must not precede start")
+        self.start = start
+        self.end = end
+        self.holidays = frozenset(holidays)
+        self._base = start.toordinal()
+        holiday_ordinals = {d.toordinal() for d in self.holidays}
+        index = array('l')
+        count = 0
+        for ordinal in range(self._base, end.toordinal() + 1):
+            if (ordinal - 1) % 7 < 5 and ordinal not in holiday_ordinals:
+                count += 1
+            index.append(count)
+        self._index = index
+        self._index_np = np.frombuffer(index, dtype=np.int64 if index.itemsize == 8 else np.int32) \
+            if np is not None else None
+
+    @classmethod
+    def from_file(cls, path: str, start: datetime.date = DEFAULT_START,
+                  end: datetime.date = DEFAULT_END) -> "BusinessCalendar":
+        return _calendar_for(os.path.abspath(path), os.stat(path).st_mtime_ns, start, end)
+
+    def _position(self, day: datetime.date) -> int:
+        position = day.toordinal() - self._base
+        if not 0 <= position < len(self._index):
+            raise ValueError(f"{day} is outside the calendar range {self.start}..{self.end}")
+        return position
+
+    def is_business_day(self, day: datetime.date) -> bool:
+        position = self._position(day)
+        previous = self._index[position - 1] if position else 0
+        return self._index[position] > previous
+
+    def business_days_between(self, start: datetime.date, end: datetime.date) -> int:
+        """Business days in (start, end]; negative when ``end`` precedes ``start``."""
+        return self._index[self._position(end)] - self._index[self._position(start)]
+
+    def _target(self, position: int, days: int) -> int:
+        count = self._index[position]
+        if days > 0:
+            return count + days
+        # Moving backwards from a non-business day, the previous business day is the first step
+        on_business_day = count > (self._index[position - 1] if position else 0)
+        return count + days + (0 if on_business_day else 1)
+
+    def add_business_days(self, start: datetime.date, days: int) -> datetime.date:
+        """The ``days``-th business day after (or before, if negative) ``start`` in O(log n)."""
+        if days == 0:
+            return start
+        target = self._target(self._position(start), days)
+        position = bisect_left(self._index, target)
+        if target < 1 or position >= len(self._index):
+            raise ValueError("Result falls outside the calendar range")
+        return datetime.date.fromordinal(self._base + position)
+
+    def add_business_days_many(self, starts: Sequence[datetime.date], days: Sequence[int]) -> List[datetime.date]:
+        """Vectorized add_business_days over parallel sequences of dates and offsets."""
+        if len(starts) != len(days):
+            raise ValueError("starts and days must have the same length")
+        if np is None:
+            return [self.add_business_days(s, d) for s, d in zip(starts, days)]
+        positions = np.fromiter((s.toordinal() for s in starts), dtype=np.int64, count=len(starts)) - self._base
+        offsets = np.asarray(days, dtype=np.int64)
+        if positions.size and (positions.min() < 0 or positions.max() >= len(self._index)):
+            raise ValueError("A start date is outside the calendar range")
+        index = self._index_np
+        counts = index[positions]
+        previous = np.where(positions > 0, index[np.maximum(positions - 1, 0)], 0)
+        on_business_day = counts > previous
+        targets = counts + offsets + np.where((offsets < 0) & ~on_business_day, 1, 0)
+        result = np.searchsorted(index, targets, side='left')
+        if ((targets < 1) | (result >= len(index))).any():
+            raise ValueError("Result falls outside the calendar range")
+        result = np.where(offsets == 0, positions, result) + self._base
+        return [datetime.date.fromordinal(int(o)) for o in result]
+
+
+@lru_cache(maxsize=8)
+def _calendar_for(path: str, mtime_ns: int, start: datetime.date, end: datetime.date) -> BusinessCalendar:
+    return BusinessCalendar(_load_holidays(path, mtime_ns), start, end)
+
+
+def benchmark_settlement(calls: int = 100_000, days: int = 10_000) -> None:
+    """Compare the day-stepping method with closed-form and indexed arithmetic."""
+    from buggy_code import BuggyDateTimeHandler
+
+    rng = random.Random(1)
+    starts = [datetime.date(2000, 1, 1) + datetime.timedelta(days=rng.randrange(20000)) for _ in range(calls)]
+    handler = BuggyDateTimeHandler()
+
+    sample = starts[:200]
+    start = time.perf_counter()
+    expected = [handler.add_business_days(s, days) for s in sample]
+    legacy = (time.perf_counter() - start) / len(sample)
+    assert [add_business_days(s, days) for s in sample] == expected
+
+    start = time.perf_counter()
+    for s in starts:
+        add_business_days(s, days)
+    closed_form = (time.perf_counter() - start) / calls
+
+    calendar = BusinessCalendar()
+    start = time.perf_counter()
+    for s in starts:
+        calendar.add_business_days(s, days)
+    indexed = (time.perf_counter() - start) / calls
+
+    print(f"day stepping : {legacy * 1e6:10.2f} us/call")
+    print(f"closed form  : {closed_form * 1e6:10.2f} us/call")
+    print(f"indexed      : {indexed * 1e6:10.2f} us/call")
+
+
+if __name__ == "__main__":
+    benchmark_settlement()
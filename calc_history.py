@@ -0,0 +1,228 @@
+# calc_history.py
+# Bounded, array-backed calculation history with running aggregates (for BuggyCalculator)
+
+import math
+import mmap
+import os
+import struct
+from array import array
+from collections import deque
+from typing import Iterator, List, Optional, Tuple
+
+from buggy_code import BuggyCalculator
+
+_HEADER = struct.Struct('<8sQQQQ')  # magic, capacity, head, count, sequence
+_MAGIC = b'CALCHIST'
+_ITEM_SIZE = 8
+
+
+def _fsum(values) -> float:
+    # fsum raises where plain addition gives NaN (inf + -inf) or inf (overflow)
+    try:
+        return math.fsum(values)
+    except ValueError:
+        return math.nan
+    except OverflowError:
+        return sum(values)
+
+
+class RingHistory:
+    """Fixed-capacity ring buffer of floats with O(1) append and incremental aggregates.
+
+    Values live in an ``array('d')``, or, when ``path`` is given, directly in a
+    memory-mapped file so the history survives restarts. Min/max are kept
+    with monotonic deques, the sum is refreshed with ``math.fsum`` once per
+    lap of the ring to bound floating-point drift.
+
+    NaN values (e.g. ``inf / inf`` from a calculator) are stored and make
+    ``sum`` and ``mean`` NaN while they are in the window, but ``min`` and
+    ``max`` skip them, since NaN compares false with everything. Evicting a
+    NaN or infinity recomputes the sum, which subtraction cannot undo.
+    """
+
+    def __init__(self, capacity: int = 1024, path: Optional[str] = None):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.path = path
+        self._mmap = None
+        self._head = 0      # next slot to write
+        self._count = 0
+        self._seq = 0       # total values ever appended
+        if path is None:
+            self._data = memoryview(array('d', bytes(capacity * _ITEM_SIZE)))
+        else:
+            self._open_mapped(path)
+        self._rebuild_aggregates()
+
+    def _open_mapped(self, path: str) -> None:
+        size = _HEADER.size + self.capacity * _ITEM_SIZE
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if not exists:
+                os.ftruncate(fd, size)
+            elif os.fstat(fd).st_size != size:
+                raise ValueError(f"{path} does not hold a history of capacity {self.capacity}")
+            self._mmap = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        if exists:
+            magic, capacity, head, count, seq = _HEADER.unpack_from(self._mmap, 0)
+            if magic != _MAGIC or capacity != self.capacity or head >= capacity or count > capacity:
+                self._mmap.close()
+                raise ValueError(f"{path} is not a valid history file")
+            self._head, self._count, self._seq = head, count, seq
+        else:
+            self._write_header()
+        self._data = memoryview(self._mmap)[_HEADER.size:].cast('d')
+
+    def _write_header(self) -> None:
+        if self._mmap is not None:
+            _HEADER.pack_into(self._mmap, 0, _MAGIC, self.capacity, self._head, self._count, self._seq)
+
+    def _rebuild_aggregates(self) -> None:
+        self._min = deque()
+        self._max = deque()
+        values = list(self._iter_chronological())
+        first_seq = self._seq - self._count
+        for offset, value in enumerate(values):
+            self._push_extrema(first_seq + offset, value)
+        self._sum = _fsum(values)
+
+    def _push_extrema(self, seq: int, value: float) -> None:
+        if value != value:      # NaN would stop every later value from popping it
+            return
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((seq, value))
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((seq, value))
+
+    def _iter_chronological(self) -> Iterator[float]:
+        start = (self._head - self._count) % self.capacity
+        for i in range(self._count):
+            yield self._data[(start + i) % self.capacity]
+
+    def append(self, value: float) -> None:
+        value = float(value)
+        data, head = self._data, self._head
+        refresh = False
+        if self._count == self.capacity:
+            refresh = not math.isfinite(data[head])
+            self._sum -= data[head]
+            evicted_seq = self._seq - self.capacity
+            if self._min[0][0] == evicted_seq:
+                self._min.popleft()
+            if self._max[0][0] == evicted_seq:
+                self._max.popleft()
+        else:
+            self._count += 1
+        data[head] = value
+        self._sum += value
+        self._push_extrema(self._seq, value)
+        self._seq += 1
+        self._head = head + 1 if head + 1 < self.capacity else 0
+        if self._head == 0 or refresh:
+            self._sum = _fsum(data[:self._count])
+        self._write_header()
+
+    def extend(self, values) -> None:
+        for value in values:
+            self.append(value)
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        return self._iter_chronological()
+
+    @property
+    def sum(self) -> float:
+        return self._sum
+
+    @property
+    def min(self) -> Optional[float]:
+        return self._min[0][1] if self._min else None
+
+    @property
+    def max(self) -> Optional[float]:
+        return self._max[0][1] if self._max else None
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self._sum / self._count if self._count else None
+
+    def last_n_views(self, n: int) -> Tuple[memoryview, ...]:
+        """Zero-copy views of the newest ``n`` values (clamped), oldest first.
+
+        Returns one view, or two when the range wraps around the ring. Views
+        must be released before ``close()`` in mmap mode.
+        """
+        n = max(0, min(n, self._count))
+        start = (self._head - n) % self.capacity
+        if n == 0:
+            return (self._data[0:0],)
+        if start + n <= self.capacity:
+            return (self._data[start:start + n],)
+        return (self._data[start:], self._data[:self._head])
+
+    def get_last_n_results(self, n: int) -> List[float]:
+        """Newest-first copy of up to ``n`` values, matching BuggyCalculator's order."""
+        values: List[float] = []
+        for view in reversed(self.last_n_views(n)):
+            values.extend(reversed(view.tolist()))
+        return values
+
+    def flush(self) -> None:
+        if self._mmap is not None:
+            self._mmap.flush()
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._data.release()
+            self._mmap.flush()
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class HistoryCalculator(BuggyCalculator):
+    """BuggyCalculator whose results are recorded in a bounded RingHistory."""
+
+    def __init__(self, capacity: int = 1024, path: Optional[str] = None):
+        super().__init__()
+        self.history = RingHistory(capacity, path)
+
+    def divide(self, a: float, b: float) -> float:
+        result = super().divide(a, b)
+        self.history.append(result)
+        return result
+
+    def get_last_n_results(self, n: int) -> List[float]:
+        return self.history.get_last_n_results(n)
+
+
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    history = RingHistory(capacity=100_000)
+    start = time.perf_counter()
+    for i in range(1_000_000):
+        history.append(i % 977)
+    print(f"append: {1_000_000 / (time.perf_counter() - start):,.0f} values/sec")
+    print(f"sum={history.sum} min={history.min} max={history.max} mean={history.mean:.3f}")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, 'history.bin')
+        with RingHistory(capacity=8, path=path) as persisted:
+            persisted.extend(range(12))
+        with RingHistory(capacity=8, path=path) as reopened:
+            print("persisted:", list(reopened), "last 3:", reopened.get_last_n_results(3))
@@ -0,0 +1,183 @@
+# chunked_store.py
+# Chunked, optionally deduplicating and retention-bounded storage (for BuggyDataProcessor)
+
+import time
+from array import array
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+
+class ChunkedStore:
+    """Append-only sequence stored as fixed-size blocks.
+
+    Blocks are lists, or ``array.array`` when a ``typecode`` is given. Every
+    block except the last is full, so positional access is a divmod. With
+    ``retention`` only the newest items are kept; with ``dedupe`` an item whose
+    ``key`` is already retained is skipped on ingest.
+    """
+
+    def __init__(self, chunk_size: int = 4096, dedupe: bool = False, retention: Optional[int] = None,
+                 key: Optional[Callable[[Any], Any]] = None, typecode: Optional[str] = None):
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        if retention is not None and retention <= 0:
+            raise ValueError("retention must be positive")
+        self.chunk_size = chunk_size
+        self.dedupe = dedupe
+        self.retention = retention
+        self.key = key
+        self.typecode = typecode
+        self._chunks: List = []
+        self._offset = 0        # items already dropped from the front of the first block
+        self._length = 0
+        self._seen = set()
+        self.dropped = 0
+        self.duplicates = 0
+
+    def _new_block(self):
+        block = array(self.typecode) if self.typecode else []
+        self._chunks.append(block)
+        return block
+
+    def __len__(self):
+        return self._length
+
+    def _keyed(self, items: Iterator, handed: List) -> Iterator:
+        # ``handed`` collects the key of every item yielded, so extend can forget the unstored ones
+        seen, key = self._seen, self.key
+        for item in items:
+            k = key(item) if key else item
+            if k in seen:
+                self.duplicates += 1
+                continue
+            seen.add(k)
+            handed.append(k)
+            yield item
+
+    def extend(self, items: Iterable) -> int:
+        """Append everything from ``items`` in block-sized batches; returns the number stored.
+
+        Retention is enforced after every block, so at most ``retention +
+        chunk_size`` items are held even while ingesting a long iterator. With
+        ``dedupe`` this means duplicates are judged against what is retained
+        at block granularity.
+        """
+        iterator = iter(items)
+        handed: List = []
+        if self.dedupe:
+            iterator = self._keyed(iterator, handed)
+        block = self._chunks[-1] if self._chunks else self._new_block()
+        added = 0
+        while True:
+            space = self.chunk_size - len(block)
+            if space == 0:
+                block = self._new_block()
+                space = self.chunk_size
+            before = len(block)
+            handed.clear()
+            try:
+                block.extend(islice(iterator, space))
+            finally:
+                # extend keeps the items before a bad one, so count what the block really holds
+                stored = len(block) - before
+                for k in handed[stored:]:
+                    self._seen.discard(k)
+                added += stored
+                self._length += stored
+                if self.retention is not None and self._length > self.retention:
+                    self._drop(self._length - self.retention)
+                    block = self._chunks[-1]
+            if stored < space:
+                break
+        if not block and len(self._chunks) > 1:
+            self._chunks.pop()
+        return added
+
+    def append(self, item) -> int:
+        return self.extend((item,))
+
+    def add_items(self, items: Optional[Iterable] = None) -> int:
+        """Compatible with BuggyDataProcessor.add_items, without the shared default list."""
+        return self.extend(items or ())
+
+    def _drop(self, count: int) -> None:
+        key = self.key
+        while count:
+            first = self._chunks[0]
+            live = len(first) - self._offset
+            n = min(count, live)
+            if self.dedupe:
+                for item in islice(first, self._offset, self._offset + n):
+                    self._seen.discard(key(item) if key else item)
+            if n == live and len(self._chunks) > 1:
+                del self._chunks[0]
+                self._offset = 0
+            elif n == live:
+                # Only block left: reuse it instead of keeping an empty shell
+                del first[:]
+                self._offset = 0
+            else:
+                if not self.typecode:
+                    first[self._offset:self._offset + n] = [None] * n  # release references early
+                self._offset += n
+            count -= n
+            self._length -= n
+            self.dropped += n
+
+    def __getitem__(self, index: int):
+        if isinstance(index, slice):
+            raise TypeError("ChunkedStore does not support slicing; use iter_range()")
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("ChunkedStore index out of range")
+        block, position = divmod(index + self._offset, self.chunk_size)
+        return self._chunks[block][position]
+
+    def iter_range(self, start: int = 0, stop: Optional[int] = None) -> Iterator:
+        """Lazily yield items in ``[start, stop)`` without copying blocks."""
+        stop = self._length if stop is None else min(stop, self._length)
+        position = max(start, 0) + self._offset
+        end = stop + self._offset
+        while position < end:
+            block, offset = divmod(position, self.chunk_size)
+            take = min(self.chunk_size - offset, end - position)
+            yield from islice(self._chunks[block], offset, offset + take)
+            position += take
+
+    def __iter__(self):
+        return self.iter_range()
+
+    def middle(self) -> List:
+        """The middle element (odd length) or the two middle elements (even length)."""
+        n = self._length
+        if n == 0:
+            return []
+        if n % 2:
+            return [self[n // 2]]
+        return [self[n // 2 - 1], self[n // 2]]
+
+    def get_middle_elements(self) -> List:
+        return self.middle()
+
+
+if __name__ == "__main__":
+    from buggy_code import BuggyDataProcessor
+
+    size = 2_000_000
+    store = ChunkedStore(retention=500_000, dedupe=True)
+    start = time.perf_counter()
+    store.extend(i % 400_000 for i in range(size))
+    print(f"ChunkedStore.extend: {size / (time.perf_counter() - start):,.0f} items/sec, "
+          f"{len(store)} retained, {store.duplicates} duplicates, {store.dropped} dropped")
+
+    start = time.perf_counter()
+    for _ in range(100_000):
+        store.middle()
+    print(f"middle(): {100_000 / (time.perf_counter() - start):,.0f} calls/sec")
+
+    legacy = BuggyDataProcessor()
+    start = time.perf_counter()
+    for offset in range(0, size, 4096):
+        legacy.add_items(list(range(offset, offset + 4096)))
+    print(f"BuggyDataProcessor.add_items: {size / (time.perf_counter() - start):,.0f} items/sec (unbounded)")
@@ -0,0 +1,159 @@
+# collection_ops.py
+# Linear-time, order-preserving collection operations (replacement for BuggyCollections helpers)
+
+import random
+import time
+from typing import Any, Callable, Hashable, Iterable, Iterator, List, Optional
+
+
+class _Frozen:
+    """Hashable key for an unhashable list, tuple or dict; only equal to another of the same kind."""
+
+    __slots__ = ('kind', 'value', '_hash')
+
+    def __init__(self, kind: type, value: Hashable):
+        self.kind = kind
+        self.value = value
+        self._hash = hash((kind, value))
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        return isinstance(other, _Frozen) and self.kind is other.kind and self.value == other.value
+
+
+def freeze(item: Any) -> Hashable:
+    """Hashable key that compares like ``item`` does with ``==``.
+
+    Sets become frozensets; lists, tuples and dicts with unhashable contents
+    become private keys. Raises TypeError for objects that cannot be frozen.
+    """
+    try:
+        hash(item)
+        return item
+    except TypeError:
+        pass
+    if isinstance(item, (set, frozenset)):
+        return frozenset(item)
+    if isinstance(item, list):
+        return _Frozen(list, tuple(freeze(x) for x in item))
+    if isinstance(item, tuple):
+        return _Frozen(tuple, tuple(freeze(x) for x in item))
+    if isinstance(item, dict):
+        return _Frozen(dict, frozenset((k, freeze(v)) for k, v in item.items()))
+    raise TypeError(f"cannot freeze {type(item).__name__!r}")
+
+
+def iter_unique(items: Iterable, key: Optional[Callable[[Any], Any]] = None) -> Iterator:
+    """Yield the first occurrence of each item, lazily.
+
+    Unhashable items are compared by their frozen form; items that cannot be
+    frozen fall back to an equality scan over the other unfreezable items only.
+    """
+    seen = set()
+    leftovers: List = []
+    for item in items:
+        k = key(item) if key else item
+        try:
+            if k in seen:
+                continue
+            seen.add(k)
+        except TypeError:
+            try:
+                frozen = freeze(k)
+            except TypeError:
+                if k in leftovers:
+                    continue
+                leftovers.append(k)
+            else:
+                if frozen in seen:
+                    continue
+                seen.add(frozen)
+        yield item
+
+
+def unique(items: Iterable, key: Optional[Callable[[Any], Any]] = None) -> List:
+    """Order-preserving unique in O(n); same result as BuggyCollections.find_unique_items."""
+    if key is None:
+        if not isinstance(items, (list, tuple)):
+            items = list(items)
+        try:
+            return list(dict.fromkeys(items))
+        except TypeError:
+            pass
+    return list(iter_unique(items, key))
+
+
+def find_unique_items(items: Iterable) -> List:
+    return unique(items)
+
+
+def retain(items: List, keep: Callable[[Any], bool]) -> List:
+    """Keep only items where ``keep(item)`` is true, in place, with a read and a write pointer.
+
+    Nothing is shifted per removal and no second list of survivors is
+    built; the tail is cut once at the end. Returns ``items``.
+    """
+    write = 0
+    for read in range(len(items)):
+        item = items[read]
+        if keep(item):
+            if read != write:
+                items[write] = item
+            write += 1
+    del items[write:]
+    return items
+
+
+def remove_if(items: List, predicate: Callable[[Any], bool]) -> List:
+    """In-place removal of every item matching ``predicate``; returns ``items``."""
+    return retain(items, lambda item: not predicate(item))
+
+
+def remove_even_numbers(numbers: List[int]) -> List[int]:
+    """Correct, in-place BuggyCollections.remove_even_numbers; one slice assignment."""
+    numbers[:] = [n for n in numbers if n % 2]
+    return numbers
+
+
+def iter_retain(items: Iterable, keep: Callable[[Any], bool]) -> Iterator:
+    return filter(keep, items)
+
+
+def iter_remove_if(items: Iterable, predicate: Callable[[Any], bool]) -> Iterator:
+    return (item for item in items if not predicate(item))
+
+
+def iter_remove_even_numbers(numbers: Iterable[int]) -> Iterator[int]:
+    return (n for n in numbers if n % 2)
+
+
+def benchmark_collections(size: int = 1_000_000, legacy_size: int = 20_000) -> None:
+    """Time the O(n) operations at ``size``; the quadratic originals only at ``legacy_size``."""
+    from buggy_code import BuggyCollections
+
+    rng = random.Random(4)
+    values = [rng.randrange(size // 2) for _ in range(size)]
+    legacy = BuggyCollections()
+
+    def timed(label, fn, data, n):
+        start = time.perf_counter()
+        fn(data)
+        elapsed = time.perf_counter() - start
+        print(f"{label:>32} (n={n:>9,}): {elapsed:8.3f}s")
+
+    small = values[:legacy_size]
+    timed('find_unique_items', legacy.find_unique_items, small, legacy_size)
+    timed('remove_even_numbers (legacy)', legacy.remove_even_numbers, list(small), legacy_size)
+
+    timed('unique', unique, values, size)
+    timed('unique (unhashable)', unique, [[v] for v in values], size)
+    timed('iter_unique', lambda data: sum(1 for _ in iter_unique(data)), values, size)
+    timed('remove_even_numbers', remove_even_numbers, list(values), size)
+    timed('remove_if (two-pointer)', lambda data: remove_if(data, lambda n: n % 2 == 0), list(values), size)
+    timed('iter_remove_even_numbers', lambda data: sum(1 for _ in iter_remove_even_numbers(data)), values, size)
+
+
+if __name__ == "__main__":
+    benchmark_collections()
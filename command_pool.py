@@ -0,0 +1,221 @@
+# command_pool.py
+# Shell-free, concurrency-capped command execution and native host probes
+# (safe replacements for VulnerableWebApp.ping_host and VulnerableOSSUsage.execute_command)
+
+import asyncio
+import os
+import socket
+import struct
+import subprocess
+import time
+import weakref
+from typing import AsyncIterator, Iterable, List, NamedTuple, Optional, Sequence
+
+
+class CommandResult(NamedTuple):
+    argv: Sequence[str]
+    returncode: Optional[int]
+    stdout: bytes
+    stderr: bytes
+    duration: float
+    timed_out: bool
+
+
+class ProbeResult(NamedTuple):
+    host: str
+    reachable: bool
+    latency: Optional[float]
+    method: str
+    error: Optional[str]
+
+
+def _check_argv(argv: Sequence[str]) -> List[str]:
+    """Reject shell strings; commands must be passed as an argv list."""
+    if isinstance(argv, (str, bytes)):
+        raise TypeError("argv must be a sequence of arguments, not a shell string")
+    argv = list(argv)
+    if not argv or not all(isinstance(arg, str) for arg in argv):
+        raise ValueError("argv must be a non-empty sequence of strings")
+    return argv
+
+
+class CommandRunner:
+    """Runs argv-style commands without a shell, at most ``max_concurrency`` at a time.
+
+    Each command is its own process, exec'd directly; there are no
+    long-lived workers to hand commands to. Dropping the shell removes most
+    of the per-call cost, and the probes below avoid spawning altogether.
+    """
+
+    def __init__(self, max_concurrency: int = 32, default_timeout: Optional[float] = 30.0):
+        self.max_concurrency = max_concurrency
+        self.default_timeout = default_timeout
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = \
+            weakref.WeakKeyDictionary()
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # One per event loop: a semaphore is bound to the loop it is first awaited on, and
+        # the runner may be used from several asyncio.run calls
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    async def _spawn(self, argv: List[str], stderr):
+        return await asyncio.create_subprocess_exec(
+            *argv, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=stderr)
+
+    @staticmethod
+    async def _kill(process) -> None:
+        if process.returncode is None:
+            process.kill()
+        await process.wait()
+
+    async def run(self, argv: Sequence[str], timeout: Optional[float] = None) -> CommandResult:
+        """Run a command to completion, capturing its output."""
+        argv = _check_argv(argv)
+        timeout = self.default_timeout if timeout is None else timeout
+        async with self.semaphore:
+            start = time.perf_counter()
+            process = await self._spawn(argv, subprocess.PIPE)
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+                timed_out = False
+            except asyncio.TimeoutError:
+                await self._kill(process)
+                stdout, stderr, timed_out = b"", b"", True
+            except BaseException:
+                # Cancelled by the caller (e.g. an outer wait_for): the child must not outlive the task
+                await self._kill(process)
+                raise
+            return CommandResult(argv, process.returncode, stdout, stderr,
+                                 time.perf_counter() - start, timed_out)
+
+    async def stream(self, argv: Sequence[str], timeout: Optional[float] = None) -> AsyncIterator[bytes]:
+        """Yield stdout line by line as the command produces it.
+
+        The process is killed if it outlives ``timeout`` or the consumer stops early.
+        """
+        argv = _check_argv(argv)
+        timeout = self.default_timeout if timeout is None else timeout
+        async with self.semaphore:
+            process = await self._spawn(argv, subprocess.DEVNULL)
+            deadline = None if timeout is None else asyncio.get_running_loop().time() + timeout
+            try:
+                while True:
+                    remaining = None if deadline is None else deadline - asyncio.get_running_loop().time()
+                    if remaining is not None and remaining <= 0:
+                        raise asyncio.TimeoutError(f"{argv[0]} exceeded {timeout}s")
+                    line = await asyncio.wait_for(process.stdout.readline(), remaining)
+                    if not line:
+                        break
+                    yield line
+                await process.wait()
+            finally:
+                await self._kill(process)
+
+    async def run_many(self, commands: Iterable[Sequence[str]],
+                       timeout: Optional[float] = None) -> List[CommandResult]:
+        """Run many commands concurrently, at most ``max_concurrency`` at a time."""
+        return await asyncio.gather(*(self.run(argv, timeout) for argv in commands))
+
+
+# ==================== NATIVE PROBES ====================
+
+def _icmp_checksum(packet: bytes) -> int:
+    if len(packet) % 2:
+        packet += b"\0"
+    total = sum(struct.unpack(f"!{len(packet) // 2}H", packet))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+async def icmp_probe(host: str, timeout: float = 1.0) -> ProbeResult:
+    """Send one ICMP echo through an unprivileged datagram socket.
+
+    Requires the kernel to allow unprivileged ping (``net.ipv4.ping_group_range``).
+    """
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    try:
+        address = (await loop.getaddrinfo(host, None, family=socket.AF_INET))[0][4][0]
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+    except OSError as e:
+        return ProbeResult(host, False, None, 'icmp', str(e))
+    with sock:
+        sock.setblocking(False)
+        payload = struct.pack("!d", start)
+        header = struct.pack("!BBHHH", 8, 0, 0, os.getpid() & 0xFFFF, 1)
+        checksum = _icmp_checksum(header + payload)
+        packet = struct.pack("!BBHHH", 8, 0, checksum, os.getpid() & 0xFFFF, 1) + payload
+        try:
+            await loop.sock_connect(sock, (address, 0))
+            await loop.sock_sendall(sock, packet)
+            reply = await asyncio.wait_for(loop.sock_recv(sock, 1024), timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            return ProbeResult(host, False, None, 'icmp', str(e) or type(e).__name__)
+    reachable = bool(reply) and reply[0] == 0  # echo reply
+    return ProbeResult(host, reachable, time.perf_counter() - start, 'icmp', None)
+
+
+async def tcp_probe(host: str, port: int = 80, timeout: float = 1.0) -> ProbeResult:
+    """Check reachability with a TCP connect; a refused connection still proves the host is up."""
+    start = time.perf_counter()
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except ConnectionRefusedError:
+        return ProbeResult(host, True, time.perf_counter() - start, 'tcp', None)
+    except (OSError, asyncio.TimeoutError) as e:
+        return ProbeResult(host, False, None, 'tcp', str(e) or type(e).__name__)
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return ProbeResult(host, True, time.perf_counter() - start, 'tcp', None)
+
+
+async def probe_hosts(hosts: Iterable[str], method: str = 'tcp', port: int = 80,
+                      timeout: float = 1.0, max_concurrency: int = 256) -> List[ProbeResult]:
+    """Probe many hosts concurrently without spawning any processes."""
+    if method not in ('tcp', 'icmp'):
+        raise ValueError(f"Unknown probe method: {method}")
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def probe(host):
+        async with semaphore:
+            if method == 'icmp':
+                return await icmp_probe(host, timeout)
+            return await tcp_probe(host, port, timeout)
+
+    return await asyncio.gather(*(probe(host) for host in hosts))
+
+
+def benchmark_health_check(count: int = 200) -> None:
+    """Compare shell-per-call ping with capped direct exec and native probes against localhost."""
+    hosts = ["127.0.0.1"] * count
+
+    start = time.perf_counter()
+    for host in hosts[:20]:
+        subprocess.run(f"true {host}", shell=True, capture_output=True)
+    shell_rate = 20 / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    asyncio.run(CommandRunner(max_concurrency=16).run_many([["true", host] for host in hosts]))
+    pool_rate = count / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    results = asyncio.run(probe_hosts(hosts, method='tcp', port=9))
+    probe_rate = count / (time.perf_counter() - start)
+
+    print(f"shell=True per call : {shell_rate:10.1f} checks/sec")
+    print(f"CommandRunner exec  : {pool_rate:10.1f} checks/sec")
+    print(f"TCP connect probe   : {probe_rate:10.1f} checks/sec "
+          f"({sum(r.reachable for r in results)}/{count} reachable)")
+
+
+if __name__ == "__main__":
+    benchmark_health_check()
@@ -0,0 +1,337 @@
+# currency_format.py
+# Bulk currency formatting with masks, negatives and locale grouping
+# (replacement for BuggyStringProcessor.format_currency)
+
+import io
+import math
+import random
+import re
+import time
+from itertools import islice
+from typing import Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+
+
+class CurrencyStyle(NamedTuple):
+    prefix: str = '$'
+    suffix: str = ''
+    negative_prefix: str = '-$'
+    negative_suffix: str = ''
+    group_separator: str = ','
+    decimal_separator: str = '.'
+    decimals: int = 2
+    missing: str = ''           # text for None, NaN, infinite and masked values
+
+
+US = CurrencyStyle()
+US_ACCOUNTING = CurrencyStyle(negative_prefix='($', negative_suffix=')')
+EURO_DE = CurrencyStyle(prefix='', suffix=' €', negative_prefix='-', negative_suffix=' €',
+                        group_separator='.', decimal_separator=',')
+FRANC_CH = CurrencyStyle(prefix='CHF ', negative_prefix='CHF -', group_separator="'")
+
+_CHUNK = 65536
+_BULK = 1024                    # amounts per '%' call on the bulk path
+_MAX_EXACT_CENTS = 1 << 50      # below this, cents / 10**decimals formats back to the exact digits
+_FORMATTED_CHARS = frozenset('0123456789,.-naif')     # what '%f' emits for a float, nan and inf
+_FLOAT_TYPES = frozenset({float, int, bool, type(None)})
+_TO_GROUP = bytes.maketrans(b'0123456789', b',' * 10)
+_DROP_SIGN = bytes.maketrans(b'-', b' ')
+
+
+class _Plan(NamedTuple):
+    format_one: object          # callable: value -> str
+    table: Optional[dict]       # deferred str.translate table for the joined output, if any
+    bulk: object                # callable: list -> joined str, or None when amounts are formatted one by one
+
+
+def _plan(style: CurrencyStyle, minor_units: bool, separator: str = '\n', per_amount: bool = False) -> _Plan:
+    """Per-amount formatter using ',' and '.', plus how to get to the style's separators.
+
+    When neither the affixes nor ``separator`` contain ',' or '.', the
+    separators are swapped with one translate over the joined output;
+    otherwise each number is translated before its affixes are added.
+
+    The bulk formatter, when the style allows one, formats up to ``_BULK``
+    amounts with a single '%' call and groups their digits column by column
+    (see ``_column_layout``); negatives, NaN and infinities are then patched
+    in the joined text, so only they cost Python-level work.
+    """
+    decimals = style.decimals
+    prefix, suffix = style.prefix, style.suffix
+    negative_prefix, negative_suffix = style.negative_prefix, style.negative_suffix
+    missing = style.missing
+    table = None
+    if (style.group_separator, style.decimal_separator) != (',', '.'):
+        table = str.maketrans({',': style.group_separator, '.': style.decimal_separator})
+    fixed_text = prefix + suffix + negative_prefix + negative_suffix + missing + separator
+    deferred = table is not None and not per_amount and not any(c in fixed_text for c in ',.')
+    inline = table if table is not None and not deferred else None
+
+    if minor_units:
+        scale = 10 ** decimals
+        number_spec = f"0{decimals}d"
+
+        def format_one(value):
+            if value is None:
+                return missing
+            if type(value) is not int:
+                # Float cents columns use NaN for missing values; whole floats are fine
+                if not math.isfinite(value):
+                    return missing
+                if value != int(value):
+                    raise ValueError(f"minor-unit amounts must be whole numbers, got {value!r}")
+                value = int(value)
+            if value < 0:
+                whole, fraction = divmod(-value, scale)
+                pre, post = negative_prefix, negative_suffix
+            else:
+                whole, fraction = divmod(value, scale)
+                pre, post = prefix, suffix
+            text = f"{whole:,}.{fraction:{number_spec}}" if decimals else f"{whole:,}"
+            if inline is not None:
+                text = text.translate(inline)
+            return f"{pre}{text}{post}"
+    else:
+        spec = f",.{decimals}f"
+        zero = format(0.0, spec)
+
+        def format_one(value):
+            if value is None:
+                return missing
+            text = format(value, spec)
+            if not text[-1].isdigit():      # 'nan', 'inf' or '-inf'
+                return missing
+            negative = text[0] == '-'
+            if negative:
+                text = text[1:]
+                negative = text != zero     # -0.001 rounds to '-0.00', which is zero
+            if inline is not None:
+                text = text.translate(inline)
+            if negative:
+                return f"{negative_prefix}{text}{negative_suffix}"
+            return f"{prefix}{text}{suffix}"
+
+    # The bulk path needs single ASCII separators, and affixes that cannot be mistaken
+    # for part of a printed number
+    bulk = None
+    marks = style.group_separator + style.decimal_separator
+    plain = prefix + suffix + separator
+    if (inline is None and separator and not per_amount and len(marks) == 2 and marks.isascii()
+            and not any(c.isspace() or c in plain or c in '0123456789-naif' for c in marks)
+            and not _FORMATTED_CHARS.intersection(plain)):
+        bulk = _bulk_formatter(style, minor_units, separator, format_one, table)
+        table = None            # the bulk formatter swaps separators before adding the affixes
+    return _Plan(format_one, table if deferred else None, bulk)
+
+
+def _column_layout(width: int, decimals: int) -> List[Tuple[Optional[int], Optional[bytes]]]:
+    """Output columns for amounts printed right-aligned in ``width`` characters.
+
+    Each entry is ``(source column, translate table)``; source None is the
+    blank column that keeps neighbouring amounts apart. A group separator
+    column copies the column to its left with digits turned into ','; a
+    sign there moves onto the separator column, so padding never gets one.
+    """
+    whole = width - decimals - 1 if decimals else width
+    columns = []
+    for column in range(width):
+        if 0 < column < whole and (whole - column) % 3 == 0:
+            columns[-1] = (column - 1, _DROP_SIGN)
+            columns.append((column - 1, _TO_GROUP))
+        columns.append((column, None))
+    columns.append((None, None))
+    return columns
+
+
+def _grouped_numbers(values: list, width: int, decimals: int, layout,
+                     marks: Optional[bytes]) -> Optional[List[str]]:
+    # Right-aligned, every column of the '%' output holds one digit position, so grouping
+    # is a handful of extended-slice copies rather than per-amount work
+    count = len(values)
+    raw = ((f"%{width}.{decimals}f" * count) % tuple(values)).encode('ascii')
+    if len(raw) != width * count:
+        return None             # some amount needs more than ``width`` characters
+    step = len(layout)
+    out = bytearray(b' ') * (step * count)
+    for position, (source, table) in enumerate(layout):
+        if source is not None:
+            column = raw[source::width]
+            out[position::step] = column if table is None else column.translate(table)
+    if marks is not None:
+        out = out.translate(marks)
+    return out.decode('ascii').split()
+
+
+def _bulk_formatter(style: CurrencyStyle, minor_units: bool, separator: str, format_one, table: Optional[dict]):
+    # The affixes and separator share no character with the printed numbers, so in the joined
+    # text prefix + '-' only starts a negative and prefix + 'nan' / 'inf' only a missing value
+    prefix, suffix, missing = style.prefix, style.suffix, style.missing
+    decimals = style.decimals
+    zero = format(0.0, f",.{decimals}f")
+    marks = None
+    if table is not None:
+        marks = bytes.maketrans(b',.', (style.group_separator + style.decimal_separator).encode('ascii'))
+        zero = zero.translate(table)
+    digit = '[\\d' + re.escape(style.group_separator + style.decimal_separator) + ']'
+    negative = re.compile(re.escape(prefix + '-') + f"({digit}+|inf)" + re.escape(suffix))
+    not_a_number = prefix + 'nan' + suffix
+    infinity = prefix + 'inf' + suffix
+    join = (suffix + separator + prefix).join
+    scale = 10 ** decimals
+    # A sign and 7 whole digits, then as many as the input allows: 15 for floats, and for
+    # cents as many as keep them below _MAX_EXACT_CENTS; wider amounts go one by one
+    widest = len(str(_MAX_EXACT_CENTS // scale)) - 1 if minor_units else 15
+    point = decimals + 1 if decimals else 0
+    widths = [(1 + digits + point, _column_layout(1 + digits + point, decimals))
+              for digits in sorted({min(7, widest), widest})]
+    narrowest = [0]             # index of the width that fitted the previous chunk
+
+    def unsign(match):
+        number = match.group(1)
+        if number == 'inf':
+            return missing
+        if number == zero:
+            return prefix + zero + suffix
+        return style.negative_prefix + number + style.negative_suffix
+
+    def one_by_one(values: list) -> str:
+        text = separator.join(map(format_one, values))
+        return text.translate(table) if table is not None else text
+
+    def bulk(values: list) -> str:
+        types = set(map(type, values))
+        printable = values
+        if minor_units:
+            # Whole cents divided by the scale print their own digits; floats and None
+            # go through the per-amount checks
+            if not types <= {int}:
+                return one_by_one(values)
+            printable = list(map(scale.__rtruediv__, values))
+        elif not types <= _FLOAT_TYPES:
+            return one_by_one(values)
+        elif type(None) in types:
+            printable = [math.nan if value is None else value for value in values]
+        for index in range(narrowest[0], len(widths)):
+            numbers = _grouped_numbers(printable, widths[index][0], decimals, widths[index][1], marks)
+            if numbers is not None:
+                narrowest[0] = index
+                break
+        else:
+            return one_by_one(values)
+        text = prefix + join(numbers) + suffix
+        if '-' in text:
+            text = negative.sub(unsign, text)
+        if 'n' in text:
+            text = text.replace(not_a_number, missing).replace(infinity, missing)
+        return text
+
+    return bulk
+
+
+def _as_list(values) -> list:
+    # NumPy arrays (and masked arrays) convert to Python scalars in one call
+    if hasattr(values, 'tolist'):
+        values = values.tolist()
+    return values if isinstance(values, list) else list(values)
+
+
+def _apply_mask(values: list, mask) -> list:
+    if mask is None:
+        return values
+    mask = _as_list(mask)
+    if len(mask) != len(values):
+        raise ValueError(f"mask has {len(mask)} entries for {len(values)} values")
+    return [None if hidden else value for value, hidden in zip(values, mask)]
+
+
+def _format_chunk(values: list, plan: _Plan, separator: str) -> str:
+    if plan.bulk is None:
+        text = separator.join(map(plan.format_one, values))
+    else:
+        text = separator.join([plan.bulk(values[i:i + _BULK]) for i in range(0, len(values), _BULK)])
+    return text.translate(plan.table) if plan.table is not None else text
+
+
+def format_amounts(values: Iterable, style: CurrencyStyle = US, mask: Optional[Iterable[bool]] = None,
+                   minor_units: bool = False) -> List[str]:
+    """Format every amount; ``minor_units`` treats values as integer cents (no float formatting)."""
+    # Joined output is split on '\n' below, which must not occur inside an amount
+    plan = _plan(style, minor_units, per_amount=any('\n' in text for text in style[:6] + (style.missing,)))
+    values = _apply_mask(_as_list(values), mask)
+    if plan.table is None and plan.bulk is None:
+        return list(map(plan.format_one, values))
+    # One join, translate and split instead of per-amount work
+    return _format_chunk(values, plan, '\n').split('\n') if values else []
+
+
+def format_joined(values: Iterable, style: CurrencyStyle = US, mask: Optional[Iterable[bool]] = None,
+                  separator: str = '\n', minor_units: bool = False) -> str:
+    """All amounts as one string, built with a single join."""
+    plan = _plan(style, minor_units, separator)
+    return _format_chunk(_apply_mask(_as_list(values), mask), plan, separator)
+
+
+def iter_formatted_chunks(values: Iterable, style: CurrencyStyle = US, mask: Optional[Iterable[bool]] = None,
+                          separator: str = '\n', minor_units: bool = False,
+                          chunk_size: int = _CHUNK) -> Iterator[str]:
+    """Lazily yield the joined output in pieces of ``chunk_size`` amounts, each ending with ``separator``."""
+    plan = _plan(style, minor_units, separator)
+    values = iter(values.tolist() if hasattr(values, 'tolist') else values)
+    mask = _as_list(mask) if mask is not None else None
+    seen = 0
+    while True:
+        chunk = list(islice(values, chunk_size))
+        if not chunk:
+            if mask is not None and len(mask) != seen:
+                raise ValueError(f"mask has {len(mask)} entries for {seen} values")
+            return
+        if mask is not None:
+            if len(mask) < seen + len(chunk):
+                raise ValueError(f"mask has {len(mask)} entries for more values")
+            chunk = _apply_mask(chunk, mask[seen:seen + len(chunk)])
+        seen += len(chunk)
+        yield _format_chunk(chunk, plan, separator) + separator
+
+
+def write_amounts(values: Iterable, file: TextIO, style: CurrencyStyle = US, mask: Optional[Iterable[bool]] = None,
+                  separator: str = '\n', minor_units: bool = False) -> int:
+    """Stream formatted amounts to a text file, one joined chunk per write; returns characters written."""
+    written = 0
+    for piece in iter_formatted_chunks(values, style, mask, separator, minor_units):
+        file.write(piece)
+        written += len(piece)
+    return written
+
+
+def format_currency(amount: Optional[float], style: CurrencyStyle = US) -> str:
+    """Single-amount counterpart of BuggyStringProcessor.format_currency; safe for None and negatives."""
+    return format_amounts([amount], style)[0]
+
+
+def benchmark_currency(size: int = 1_000_000, repeat: int = 3) -> None:
+    """Amounts per second for per-call formatting versus the bulk paths, best of ``repeat`` runs."""
+    from buggy_code import BuggyStringProcessor
+
+    rng = random.Random(12)
+    amounts = [round(rng.uniform(-50_000, 1_000_000), 2) for _ in range(size)]
+    cents = [int(round(a * 100)) for a in amounts]
+    legacy = BuggyStringProcessor()
+
+    def timed(label, fn):
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        print(f"{label:>28}: {size / best:12,.0f} amounts/sec")
+
+    timed('format_currency per call', lambda: [legacy.format_currency(a) for a in amounts])
+    timed('format_amounts', lambda: format_amounts(amounts))
+    timed('format_joined', lambda: format_joined(amounts))
+    timed('format_joined (cents)', lambda: format_joined(cents, minor_units=True))
+    timed('format_joined (de_DE)', lambda: format_joined(amounts, EURO_DE))
+    timed('write_amounts (StringIO)', lambda: write_amounts(amounts, io.StringIO()))
+    assert format_joined(cents, minor_units=True) == format_joined(amounts)
+
+
+if __name__ == "__main__":
+    benchmark_currency()
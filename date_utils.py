@@ -0,0 +1,199 @@
+# date_utils.py
+# Gregorian calendar helpers, scalar and vectorized (replacement for is_leap_year)
+
+import datetime
+import random
+import time
+from bisect import bisect_right
+from typing import Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; vectorized functions fall back to list comprehensions
+    np = None
+
+# Shared lookup tables, indexed [leap][month]; month 0 is padding
+DAYS_IN_MONTH = (
+    (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31),
+    (0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31),
+)
+DAYS_BEFORE_MONTH = tuple(
+    tuple(sum(table[1:month]) for month in range(13)) for table in DAYS_IN_MONTH
+)
+# The leap pattern repeats every 400 years
+LEAP_CYCLE = tuple(y % 4 == 0 and (y % 100 != 0 or y % 400 == 0) for y in range(400))
+
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+if np is not None:
+    _DAYS_IN_MONTH_NP = np.array(DAYS_IN_MONTH, dtype=np.int64)
+    _DAYS_BEFORE_MONTH_NP = np.array(DAYS_BEFORE_MONTH, dtype=np.int64)
+    _LEAP_CYCLE_NP = np.array(LEAP_CYCLE, dtype=bool)
+
+
+def is_leap_year(year: int) -> bool:
+    return LEAP_CYCLE[year % 400]
+
+
+def days_in_month(year: int, month: int) -> int:
+    if not 1 <= month <= 12:
+        raise ValueError(f"month must be in 1..12, got {month}")
+    return DAYS_IN_MONTH[is_leap_year(year)][month]
+
+
+def _check_date(leap: bool, month: int, day: int) -> None:
+    if not 1 <= month <= 12:
+        raise ValueError(f"month must be in 1..12, got {month}")
+    if not 1 <= day <= DAYS_IN_MONTH[leap][month]:
+        raise ValueError(f"day must be in 1..{DAYS_IN_MONTH[leap][month]}, got {day}")
+
+
+def day_of_year(year: int, month: int, day: int) -> int:
+    leap = is_leap_year(year)
+    _check_date(leap, month, day)
+    return DAYS_BEFORE_MONTH[leap][month] + day
+
+
+def to_ordinal(year: int, month: int, day: int) -> int:
+    """Proleptic Gregorian ordinal (0001-01-01 is 1), as ``datetime.date.toordinal``."""
+    y = year - 1
+    return y * 365 + y // 4 - y // 100 + y // 400 + day_of_year(year, month, day)
+
+
+def from_ordinal(ordinal: int) -> Tuple[int, int, int]:
+    """Inverse of ``to_ordinal``, using the same cumulative-day tables."""
+    if ordinal < 1:
+        raise ValueError(f"ordinal must be >= 1, got {ordinal}")
+    n400, n = divmod(ordinal - 1, 146097)
+    n100, n = divmod(n, 36524)
+    n4, n = divmod(n, 1461)
+    n1, n = divmod(n, 365)
+    year = n400 * 400 + n100 * 100 + n4 * 4 + n1 + 1
+    if n1 == 4 or n100 == 4:
+        return year - 1, 12, 31          # last day of a leap year
+    before = DAYS_BEFORE_MONTH[n1 == 3 and (n4 != 24 or n100 == 3)]
+    month = bisect_right(before, n, 1, 13) - 1
+    return year, month, n - before[month] + 1
+
+
+def _split_ordinals(ordinals):
+    # from_ordinal over an int64 array; floor division keeps it proleptic below ordinal 1
+    n400, n = np.divmod(ordinals - 1, 146097)
+    n100, n = np.divmod(n, 36524)
+    n4, n = np.divmod(n, 1461)
+    n1, n = np.divmod(n, 365)
+    year = n400 * 400 + n100 * 100 + n4 * 4 + n1 + 1
+    last = (n1 == 4) | (n100 == 4)          # last day of a leap year
+    leap = ((n1 == 3) & ((n4 != 24) | (n100 == 3))).astype(np.int64)
+    month = np.where(leap, np.searchsorted(_DAYS_BEFORE_MONTH_NP[1, 1:], n, 'right'),
+                     np.searchsorted(_DAYS_BEFORE_MONTH_NP[0, 1:], n, 'right'))
+    day = n - _DAYS_BEFORE_MONTH_NP[leap, month] + 1
+    return np.where(last, year - 1, year), np.where(last, 12, month), np.where(last, 31, day)
+
+
+def is_leap_year_array(years):
+    """Element-wise leap-year test over an array of years."""
+    if np is None:
+        cycle = LEAP_CYCLE
+        return [cycle[y % 400] for y in years]
+    return _LEAP_CYCLE_NP[np.asarray(years, dtype=np.int64) % 400]
+
+
+def days_in_month_array(years, months):
+    if np is None:
+        return [days_in_month(y, m) for y, m in zip(years, months)]
+    months = np.asarray(months, dtype=np.int64)
+    if months.size and (months.min() < 1 or months.max() > 12):
+        raise ValueError("month must be in 1..12")
+    return _DAYS_IN_MONTH_NP[is_leap_year_array(years).astype(np.int64), months]
+
+
+def day_of_year_array(years, months, days):
+    if np is None:
+        return [day_of_year(y, m, d) for y, m, d in zip(years, months, days)]
+    leap = is_leap_year_array(years).astype(np.int64)
+    months = np.asarray(months, dtype=np.int64)
+    days = np.asarray(days, dtype=np.int64)
+    if months.size and (months.min() < 1 or months.max() > 12):
+        raise ValueError("month must be in 1..12")
+    if days.size and (days.min() < 1 or (days > _DAYS_IN_MONTH_NP[leap, months]).any()):
+        raise ValueError("day out of range for month")
+    return _DAYS_BEFORE_MONTH_NP[leap, months] + days
+
+
+def to_ordinal_array(years, months, days):
+    if np is None:
+        return [to_ordinal(y, m, d) for y, m, d in zip(years, months, days)]
+    y = np.asarray(years, dtype=np.int64) - 1
+    return y * 365 + y // 4 - y // 100 + y // 400 + day_of_year_array(years, months, days)
+
+
+def from_ordinal_array(ordinals):
+    """Split ordinals into ``(years, months, days)`` arrays; raises ValueError for ordinals below 1."""
+    if np is None:
+        parts = [from_ordinal(o) for o in ordinals]
+        return [p[0] for p in parts], [p[1] for p in parts], [p[2] for p in parts]
+    ordinals = np.asarray(ordinals, dtype=np.int64)
+    if ordinals.size and ordinals.min() < 1:
+        raise ValueError(f"ordinal must be >= 1, got {ordinals.min()}")
+    return _split_ordinals(ordinals)
+
+
+# datetime64 fast paths; these take NumPy arrays and require NumPy
+
+def split_datetime64(dates):
+    """``(years, months, days)`` of a ``datetime64`` array, without Python date objects."""
+    days = np.asarray(dates).astype('datetime64[D]').astype(np.int64)
+    return _split_ordinals(days + _EPOCH_ORDINAL)
+
+
+def is_leap_year_datetime64(dates):
+    years = np.asarray(dates).astype('datetime64[Y]').astype(np.int64) + 1970
+    return is_leap_year_array(years)
+
+
+def day_of_year_datetime64(dates):
+    dates = np.asarray(dates)
+    return (dates.astype('datetime64[D]') - dates.astype('datetime64[Y]')).astype(np.int64) + 1
+
+
+def days_in_month_datetime64(dates):
+    months = np.asarray(dates).astype('datetime64[M]')
+    return ((months + 1).astype('datetime64[D]') - months.astype('datetime64[D]')).astype(np.int64)
+
+
+def to_ordinal_datetime64(dates):
+    return np.asarray(dates).astype('datetime64[D]').astype(np.int64) + _EPOCH_ORDINAL
+
+
+def benchmark_leap_years(size: int = 10_000_000) -> None:
+    """Rows per second for the per-row legacy check versus the array functions."""
+    from buggy_code import BuggyDateTimeHandler
+
+    rng = random.Random(2)
+    years: Sequence[int] = [rng.randrange(1600, 2400) for _ in range(size)]
+    handler = BuggyDateTimeHandler()
+
+    start = time.perf_counter()
+    for y in years:
+        handler.is_leap_year(y)
+    legacy = time.perf_counter() - start
+
+    if np is not None:
+        years = np.array(years, dtype=np.int64)
+    start = time.perf_counter()
+    is_leap_year_array(years)
+    vectorized = time.perf_counter() - start
+
+    print(f"is_leap_year per row: {size / legacy:14,.0f} rows/sec")
+    print(f"is_leap_year_array  : {size / vectorized:14,.0f} rows/sec")
+    if np is not None:
+        dates = np.arange('1900-01-01', '2100-01-01', dtype='datetime64[D]')
+        start = time.perf_counter()
+        day_of_year_datetime64(dates)
+        days_in_month_datetime64(dates)
+        print(f"datetime64 doy+dim  : {dates.size / (time.perf_counter() - start):14,.0f} rows/sec")
+
+
+if __name__ == "__main__":
+    benchmark_leap_years()
@@ -0,0 +1,279 @@
+# demo_runner.py
+# Concurrent, time-bounded runner for PythonErrorDemonstrator
+# (replacement for PythonErrorDemonstrator.run_all_demonstrations as a health probe)
+
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # resource is Unix-only; isolated demos then run without rlimits
+    resource = None
+
+from error_code import PythonErrorDemonstrator
+
+# Same categories and order as PythonErrorDemonstrator.run_all_demonstrations
+DEMONSTRATIONS = (
+    ("Arithmetic Errors", 'demonstrate_arithmetic_errors'),
+    ("Lookup Errors", 'demonstrate_lookup_errors'),
+    ("Name Errors", 'demonstrate_name_errors'),
+    ("Type Errors", 'demonstrate_type_errors'),
+    ("Value Errors", 'demonstrate_value_errors'),
+    ("Attribute Errors", 'demonstrate_attribute_errors'),
+    ("Import Errors", 'demonstrate_import_errors'),
+    ("OS Errors", 'demonstrate_os_errors'),
+    ("Runtime Errors", 'demonstrate_runtime_errors'),
+    ("System Errors", 'demonstrate_system_errors'),
+    ("Memory Errors", 'demonstrate_memory_errors'),
+    ("Unicode Errors", 'demonstrate_unicode_errors'),
+    ("Assertion Errors", 'demonstrate_assertion_errors'),
+    ("Stop Iteration", 'demonstrate_stop_iteration'),
+    ("Generator Errors", 'demonstrate_generator_errors'),
+    ("Keyboard Interrupt", 'demonstrate_keyboard_interrupt'),
+    ("Connection Errors", 'demonstrate_connection_errors'),
+    ("JSON Errors", 'demonstrate_json_errors'),
+    ("Subprocess Errors", 'demonstrate_subprocess_errors'),
+    ("Threading Errors", 'demonstrate_threading_errors'),
+    ("Custom Exceptions", 'demonstrate_custom_exceptions'),
+    ("Context Manager Errors", 'demonstrate_context_manager_errors'),
+    ("Buffer Errors", 'demonstrate_buffer_errors'),
+)
+
+# Run in a separate process group with rlimits and killed on timeout: these allocate
+# huge lists, recurse to the limit or block on sockets and child processes, and a
+# thread stuck in a blocking call cannot be cancelled
+ISOLATED = frozenset({
+    'demonstrate_memory_errors',
+    'demonstrate_runtime_errors',
+    'demonstrate_connection_errors',
+    'demonstrate_subprocess_errors',
+})
+
+DEFAULT_TIMEOUT = 5.0
+DEFAULT_MEMORY_LIMIT = 1 << 30      # RLIMIT_AS for isolated demos, bytes
+_GRACE = 0.5                        # between SIGTERM and SIGKILL
+_POLL = 0.1                         # deadline check interval for in-process demos
+
+
+class DemoResult(NamedTuple):
+    category: str
+    status: str             # 'ok', 'error' (unexpected exception), 'timeout' or 'crashed'
+    duration: float         # seconds the demo ran, or waited for before being cancelled
+    errors: List[str]       # what the demonstration returned
+    detail: str = ''
+    isolated: bool = False
+
+
+def _call(method_name: str) -> Tuple[str, List[str], str]:
+    try:
+        return 'ok', list(getattr(PythonErrorDemonstrator(), method_name)() or []), ''
+    except Exception as e:
+        return 'error', [], f"Unexpected error: {e}"
+
+
+def _set_limits(memory_limit: Optional[int], cpu_limit: Optional[int]) -> None:
+    if resource is None:
+        return
+    limits = []
+    if memory_limit is not None:
+        limits.append((resource.RLIMIT_AS, memory_limit))
+    if cpu_limit is not None:
+        limits.append((resource.RLIMIT_CPU, cpu_limit))
+    for kind, value in limits:
+        _, hard = resource.getrlimit(kind)
+        if hard != resource.RLIM_INFINITY:
+            value = min(value, hard)
+        try:
+            resource.setrlimit(kind, (value, hard))
+        except (ValueError, OSError):
+            pass
+
+
+def _isolated_main(method_name: str, conn, memory_limit: Optional[int], cpu_limit: Optional[int]) -> None:
+    # Own process group, so a timeout also reaches children such as `sleep`
+    if hasattr(os, 'setsid'):
+        os.setsid()
+    _set_limits(memory_limit, cpu_limit)
+    start = time.perf_counter()
+    status, errors, detail = _call(method_name)
+    conn.send((status, errors, detail, time.perf_counter() - start))
+    conn.close()
+
+
+def _stop(process) -> None:
+    if process.exitcode is not None:
+        return
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except (AttributeError, OSError):     # no process groups, or setsid has not run yet
+        process.terminate()
+    process.join(_GRACE)
+    if process.exitcode is None:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (AttributeError, OSError):
+            process.kill()
+        process.join()
+
+
+def _exit_detail(exitcode: Optional[int]) -> str:
+    if exitcode is not None and exitcode < 0:
+        try:
+            return f"killed by {signal.Signals(-exitcode).name}"
+        except ValueError:
+            pass
+    return f"exited with code {exitcode} before reporting"
+
+
+def _context():
+    # fork is unsafe once the worker threads are running; forkserver children start cheaply
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def _run_isolated(category: str, method_name: str, timeout: float,
+                  memory_limit: Optional[int], cpu_limit: Optional[int]) -> DemoResult:
+    receiver, sender = _context().Pipe(duplex=False)
+    process = _context().Process(target=_isolated_main, name=f"demo-{method_name}",
+                                 args=(method_name, sender, memory_limit, cpu_limit), daemon=True)
+    start = time.perf_counter()
+    try:
+        process.start()
+    except OSError as e:        # fork/exec failure, e.g. process or memory limits in the caller
+        receiver.close()
+        return DemoResult(category, 'crashed', time.perf_counter() - start, [], f"could not start: {e}", True)
+    finally:
+        sender.close()
+    try:
+        if receiver.poll(timeout):
+            try:
+                status, errors, detail, duration = receiver.recv()
+            except EOFError:        # died before sending anything
+                process.join()
+                return DemoResult(category, 'crashed', time.perf_counter() - start, [],
+                                  _exit_detail(process.exitcode), True)
+            process.join(_GRACE)
+            return DemoResult(category, status, duration, errors, detail, True)
+        return DemoResult(category, 'timeout', time.perf_counter() - start, [],
+                          f"Timed out after {timeout:g}s", True)
+    finally:
+        _stop(process)
+        receiver.close()
+
+
+def run_demonstrations(timeout: float = DEFAULT_TIMEOUT, timeouts: Optional[Dict[str, float]] = None,
+                       isolate: Iterable[str] = ISOLATED, max_workers: Optional[int] = None,
+                       memory_limit: Optional[int] = DEFAULT_MEMORY_LIMIT,
+                       demonstrations: Iterable[Tuple[str, str]] = DEMONSTRATIONS) -> List[DemoResult]:
+    """Run every demonstration concurrently; one DemoResult per category, in input order.
+
+    ``timeout`` (or ``timeouts[category]``) is counted from when a demo
+    starts. Isolated demos run in their own process with an address-space
+    and CPU rlimit and are killed, children included, when they overrun.
+    In-process demos run on daemon threads; an overrunning one is reported
+    as 'timeout' and abandoned, since Python threads cannot be interrupted,
+    and cannot keep the interpreter alive at exit.
+    """
+    demonstrations = list(demonstrations)
+    isolate = frozenset(isolate)
+    timeouts = timeouts or {}
+    results: Dict[int, DemoResult] = {}
+    started: Dict[int, float] = {}
+    tasks: queue.SimpleQueue = queue.SimpleQueue()
+    finished: queue.SimpleQueue = queue.SimpleQueue()
+    cancelled = threading.Event()
+
+    def worker():
+        while not cancelled.is_set():
+            try:
+                index, category, method_name, limit = tasks.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                if method_name in isolate:
+                    # The process enforces its own deadline; the extra second covers its startup
+                    result = _run_isolated(category, method_name, limit, memory_limit, int(limit) + 1)
+                else:
+                    started[index] = time.perf_counter()
+                    status, errors, detail = _call(method_name)
+                    result = DemoResult(category, status, time.perf_counter() - started[index], errors, detail)
+            except BaseException as e:
+                result = e
+            finished.put((index, result))
+
+    limits = {}
+    for index, (category, method_name) in enumerate(demonstrations):
+        limits[index] = timeouts.get(category, timeout)
+        tasks.put((index, category, method_name, limits[index]))
+    for n in range(min(max_workers or len(demonstrations), len(demonstrations))):
+        threading.Thread(target=worker, name=f"demo_{n}", daemon=True).start()
+
+    try:
+        while len(results) < len(demonstrations):
+            # Isolated demos time themselves out; in-process ones are checked here, and a
+            # queued one may start at any moment, so poll while any of them is pending
+            now = time.perf_counter()
+            wait_for = _POLL
+            for index, (_, method_name) in enumerate(demonstrations):
+                if index not in results and method_name not in isolate and index in started:
+                    wait_for = max(min(wait_for, started[index] + limits[index] - now), 0)
+            try:
+                index, result = finished.get(timeout=wait_for)
+            except queue.Empty:
+                pass
+            else:
+                if isinstance(result, BaseException):
+                    raise result
+                results.setdefault(index, result)
+            now = time.perf_counter()
+            for index, (category, method_name) in enumerate(demonstrations):
+                if (index not in results and method_name not in isolate and index in started
+                        and now - started[index] >= limits[index]):
+                    results[index] = DemoResult(category, 'timeout', now - started[index], [],
+                                                f"Timed out after {limits[index]:g}s")
+    finally:
+        cancelled.set()         # queued demos are not started once the run is over
+    return [results[index] for index in range(len(demonstrations))]
+
+
+def to_all_errors(results: Iterable[DemoResult]) -> List[Tuple[str, str]]:
+    """``(category, error)`` pairs in the format run_all_demonstrations returns."""
+    all_errors = []
+    for result in results:
+        all_errors.extend((result.category, error) for error in result.errors)
+        if result.status == 'error':
+            all_errors.append((result.category, result.detail))
+        elif result.status in ('timeout', 'crashed'):
+            all_errors.append((result.category, f"Unexpected error: {result.detail}"))
+    return all_errors
+
+
+def format_report(results: Iterable[DemoResult]) -> str:
+    """Per-category status and duration table."""
+    lines = [f"{'category':<24} {'status':<8} {'seconds':>8} {'errors':>6}  where"]
+    for result in results:
+        where = 'process' if result.isolated else 'thread'
+        lines.append(f"{result.category:<24} {result.status:<8} {result.duration:8.3f} "
+                     f"{len(result.errors):>6}  {where}{'  ' + result.detail if result.detail else ''}")
+    return '\n'.join(lines)
+
+
+def benchmark_runner(timeout: float = DEFAULT_TIMEOUT) -> None:
+    """Wall time of the sequential run_all_demonstrations versus the concurrent runner."""
+    start = time.perf_counter()
+    sequential = PythonErrorDemonstrator().run_all_demonstrations()
+    print(f"run_all_demonstrations: {time.perf_counter() - start:6.2f}s ({len(sequential)} errors)")
+
+    start = time.perf_counter()
+    results = run_demonstrations(timeout)
+    print(f"run_demonstrations    : {time.perf_counter() - start:6.2f}s ({len(to_all_errors(results))} errors)")
+    print(format_report(results))
+
+
+if __name__ == "__main__":
+    benchmark_runner()
@@ -0,0 +1,470 @@
+# event_hub.py
+# Strong or weak callbacks, bounded spilling buffer and batched dispatch
+# (replacement for MemoryLeakExample)
+
+import gc
+import json
+import logging
+import os
+import struct
+import tempfile
+import threading
+import time
+import tracemalloc
+import weakref
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_RECORD = struct.Struct('<BI')     # payload kind, payload length
+_BYTES, _TEXT, _JSON = 0, 1, 2
+
+
+def encode_payload(data: Any) -> Tuple[int, bytes]:
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return _BYTES, bytes(data)
+    if isinstance(data, str):
+        return _TEXT, data.encode('utf-8')
+    return _JSON, json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+def decode_payload(kind: int, payload: bytes) -> Any:
+    if kind == _BYTES:
+        return payload
+    if kind == _TEXT:
+        return payload.decode('utf-8')
+    return json.loads(payload)
+
+
+def _scan_segment(path: str) -> Tuple[int, int]:
+    # Complete records in a segment and their size; a record cut short by a crash is ignored
+    items = offset = 0
+    with open(path, 'rb') as f:
+        end = os.fstat(f.fileno()).st_size
+        while offset + _RECORD.size <= end:
+            f.seek(offset)
+            _, length = _RECORD.unpack(f.read(_RECORD.size))
+            if offset + _RECORD.size + length > end:
+                break
+            offset += _RECORD.size + length
+            items += 1
+    return items, offset
+
+
+class BufferStats(NamedTuple):
+    items: int
+    bytes: int
+    spilled_items: int
+    spilled_bytes: int
+    dropped: int
+
+
+class SpillBuffer:
+    """Ring buffer bounded by item count and/or payload bytes.
+
+    Entries pushed out of memory are appended to segment files in
+    ``spill_dir`` (or dropped when it is None). Spilled data is itself capped
+    at ``max_spill_bytes``; the oldest segment is deleted when it is exceeded.
+    Segments already in ``spill_dir`` from an earlier buffer are adopted on
+    start, oldest first, so entries a previous process spilled are iterated
+    (and count against the cap) instead of being left on disk for good.
+    """
+
+    def __init__(self, max_items: Optional[int] = None, max_bytes: Optional[int] = None,
+                 spill_dir: Optional[str] = None, max_spill_bytes: int = 64 * 1024 * 1024,
+                 segment_bytes: int = 4 * 1024 * 1024):
+        if max_items is None and max_bytes is None:
+            raise ValueError("SpillBuffer needs max_items or max_bytes")
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.max_spill_bytes = max_spill_bytes
+        self.segment_bytes = segment_bytes
+        self._items: deque = deque()       # (kind, payload)
+        self._bytes = 0
+        self._segments: deque = deque()    # [path, items, bytes]
+        self._segment_file = None
+        self._spilled_bytes = 0
+        self._lock = threading.Lock()
+        self.dropped = 0
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+            self._adopt_segments()
+
+    def _adopt_segments(self) -> None:
+        found = []
+        for entry in os.scandir(self.spill_dir):
+            if entry.name.startswith('spill-') and entry.name.endswith('.seg') and entry.is_file():
+                found.append((entry.stat().st_mtime_ns, entry.name, entry.path))
+        for _, _, path in sorted(found):
+            items, size = _scan_segment(path)
+            if not items:
+                os.unlink(path)
+                continue
+            self._segments.append([path, items, size])
+            self._spilled_bytes += size
+        while len(self._segments) > 1 and self._spilled_bytes > self.max_spill_bytes:
+            path, items, size = self._segments.popleft()
+            os.unlink(path)
+            self._spilled_bytes -= size
+            self.dropped += items
+
+    def append(self, data: Any) -> int:
+        """Store ``data``; returns the number of entries held in memory."""
+        kind, payload = encode_payload(data)
+        with self._lock:
+            self._items.append((kind, payload))
+            self._bytes += len(payload)
+            while self._over_limit():
+                old_kind, old_payload = self._items.popleft()
+                self._bytes -= len(old_payload)
+                if self.spill_dir:
+                    self._spill(old_kind, old_payload)
+                else:
+                    self.dropped += 1
+            return len(self._items)
+
+    def _over_limit(self) -> bool:
+        if len(self._items) <= 1:
+            return False
+        return ((self.max_items is not None and len(self._items) > self.max_items)
+                or (self.max_bytes is not None and self._bytes > self.max_bytes))
+
+    def _spill(self, kind: int, payload: bytes) -> None:
+        if self._segment_file is None or self._segments[-1][2] >= self.segment_bytes:
+            self._open_segment()
+        record = _RECORD.pack(kind, len(payload)) + payload
+        self._segment_file.write(record)
+        segment = self._segments[-1]
+        segment[1] += 1
+        segment[2] += len(record)
+        self._spilled_bytes += len(record)
+        while len(self._segments) > 1 and self._spilled_bytes > self.max_spill_bytes:
+            path, items, size = self._segments.popleft()
+            os.unlink(path)
+            self._spilled_bytes -= size
+            self.dropped += items
+
+    def _open_segment(self) -> None:
+        if self._segment_file is not None:
+            self._segment_file.close()
+        fd, path = tempfile.mkstemp(dir=self.spill_dir, prefix='spill-', suffix='.seg')
+        self._segment_file = os.fdopen(fd, 'wb', buffering=256 * 1024)
+        self._segments.append([path, 0, 0])
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[Any]:
+        """Spilled entries (oldest first) followed by those in memory."""
+        yield from self.iter_spilled()
+        with self._lock:
+            items = list(self._items)
+        for kind, payload in items:
+            yield decode_payload(kind, payload)
+
+    def iter_spilled(self) -> Iterator[Any]:
+        """Entries spilled so far; each segment is read only up to its size when iteration began."""
+        with self._lock:
+            if self._segment_file is not None:
+                self._segment_file.flush()
+            # Sizes are taken with the data flushed, so a record the writer appends later
+            # (and may flush only partly) is never read
+            segments = [(segment[0], segment[2]) for segment in self._segments]
+        for path, size in segments:
+            try:
+                f = open(path, 'rb')
+            except FileNotFoundError:
+                continue            # rotated away since the snapshot
+            with f:
+                offset = 0
+                while offset + _RECORD.size <= size:
+                    kind, length = _RECORD.unpack(f.read(_RECORD.size))
+                    offset += _RECORD.size + length
+                    if offset > size:
+                        break
+                    yield decode_payload(kind, f.read(length))
+
+    def stats(self) -> BufferStats:
+        with self._lock:
+            return BufferStats(len(self._items), self._bytes, sum(s[1] for s in self._segments),
+                               self._spilled_bytes, self.dropped)
+
+    def close(self, delete_spilled: bool = False) -> None:
+        """Close the current spill segment; its files are only deleted with ``delete_spilled``.
+
+        Segments that are kept are adopted by the next SpillBuffer opened on
+        the same ``spill_dir``.
+        """
+        with self._lock:
+            if self._segment_file is not None:
+                self._segment_file.close()
+                self._segment_file = None
+            if delete_spilled:
+                while self._segments:
+                    os.unlink(self._segments.popleft()[0])
+                self._spilled_bytes = 0
+
+
+class HubStats(NamedTuple):
+    callbacks: int          # live subscribers
+    pending: int            # events waiting for the next batch
+    dispatched: int
+    errors: int
+    buffer: BufferStats
+    traced_current: Optional[int]   # bytes, when tracemalloc is tracing
+    traced_peak: Optional[int]
+
+
+class EventHub:
+    """Event pipeline with a bounded data buffer and batched dispatch.
+
+    Callbacks are held strongly until ``unsubscribe``. With ``weak=True``
+    bound methods are held through ``weakref.WeakMethod`` and other callables
+    through ``weakref.ref``, so the subscription never keeps a subscriber
+    alive and drops out when it is collected; that only suits callables with
+    another owner, so lambdas and closures are rejected.
+
+    Batches run concurrently on ``max_workers`` threads: a callback may be
+    called from several threads at once, and events reach it in no
+    guaranteed order across batches (in order within one).
+
+    At most ``max_pending_batches`` batches are queued or running; past that,
+    ``emit`` blocks until subscribers catch up, so slow callbacks cannot grow
+    the executor's queue without bound. Events emitted from inside a callback
+    are not held back, since that would deadlock the workers.
+    """
+
+    def __init__(self, buffer: Optional[SpillBuffer] = None, batch_size: int = 256,
+                 max_workers: int = 4, max_pending_batches: Optional[int] = None):
+        self.buffer = buffer if buffer is not None else SpillBuffer(max_items=10_000)
+        self.batch_size = batch_size
+        self._callbacks: Dict[int, Callable[[], Optional[Callable]]] = {}
+        self._next_token = 0
+        self._pending: List[Any] = []
+        self._futures: "set[Future]" = set()
+        self._lock = threading.RLock()     # weakref callbacks may fire while it is held
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix='event-hub')
+        self._slots = threading.BoundedSemaphore(max_pending_batches or 4 * max_workers)
+        self._local = threading.local()    # marks worker threads while they run callbacks
+        self.dispatched = 0
+        self.errors = 0
+
+    def subscribe(self, callback: Callable[[Any], Any], weak: bool = False) -> int:
+        """Register ``callback``; returns a token for ``unsubscribe``."""
+        qualname = getattr(callback, '__qualname__', '')
+        if weak and not hasattr(callback, '__self__') and ('<lambda>' in qualname or '<locals>' in qualname):
+            raise ValueError("weak=True needs a callable with another owner, not a lambda or closure")
+        with self._lock:
+            token = self._next_token
+            self._next_token += 1
+        if not weak:
+            ref = lambda: callback  # noqa: E731
+        elif hasattr(callback, '__self__') and hasattr(callback, '__func__'):
+            ref = weakref.WeakMethod(callback, self._remover(token))
+        else:
+            ref = weakref.ref(callback, self._remover(token))
+        with self._lock:
+            self._callbacks[token] = ref
+        return token
+
+    def add_callback(self, callback: Callable[[Any], Any]) -> int:
+        return self.subscribe(callback)
+
+    def unsubscribe(self, token: int) -> None:
+        self._forget(token)
+
+    def _remover(self, token: int) -> Callable[[Any], None]:
+        # Holds the hub weakly too, so subscriptions never form a hub <-> callback cycle
+        hub_ref = weakref.ref(self)
+
+        def remove(_):
+            hub = hub_ref()
+            if hub is not None:
+                hub._forget(token)
+        return remove
+
+    def _forget(self, token: int) -> None:
+        with self._lock:
+            self._callbacks.pop(token, None)
+
+    def _live_callbacks(self) -> List[Callable]:
+        with self._lock:
+            refs = list(self._callbacks.values())
+        return [cb for cb in (ref() for ref in refs) if cb is not None]
+
+    def process_large_data(self, data: Any) -> int:
+        """Bounded counterpart of MemoryLeakExample.process_large_data; returns entries in memory."""
+        return self.buffer.append(data)
+
+    def emit(self, event: Any) -> None:
+        """Queue ``event``; a full batch is handed to the thread pool."""
+        with self._lock:
+            self._pending.append(event)
+            if len(self._pending) < self.batch_size:
+                return
+            batch, self._pending = self._pending, []
+        self._submit(batch)
+
+    def emit_many(self, events) -> None:
+        for event in events:
+            self.emit(event)
+
+    def flush(self, wait_for_completion: bool = True) -> None:
+        """Dispatch any partial batch, optionally waiting for all batches to finish."""
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if batch:
+            self._submit(batch)
+        if wait_for_completion:
+            with self._lock:
+                futures = list(self._futures)
+            wait(futures)
+
+    def _submit(self, batch: List[Any]) -> None:
+        throttled = not getattr(self._local, 'dispatching', False)
+        if throttled:
+            self._slots.acquire()
+        try:
+            future = self._executor.submit(self._dispatch, batch)
+        except BaseException:
+            if throttled:
+                self._slots.release()
+            raise
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(lambda done: self._done(done, throttled))
+
+    def _done(self, future: Future, throttled: bool) -> None:
+        with self._lock:
+            self._futures.discard(future)
+        if throttled:
+            self._slots.release()
+
+    def _dispatch(self, batch: List[Any]) -> None:
+        # Callbacks are resolved per batch and released afterwards, so a batch never pins subscribers
+        callbacks = self._live_callbacks()
+        errors = 0
+        self._local.dispatching = True
+        try:
+            for callback in callbacks:
+                for event in batch:
+                    try:
+                        callback(event)
+                    except Exception:
+                        errors += 1
+                        logger.exception("Event callback %r failed", callback)
+        finally:
+            self._local.dispatching = False
+        with self._lock:
+            self.dispatched += len(batch)
+            self.errors += errors
+
+    def stats(self) -> HubStats:
+        traced = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (None, None)
+        with self._lock:
+            pending = len(self._pending)
+        return HubStats(len(self._live_callbacks()), pending, self.dispatched, self.errors,
+                        self.buffer.stats(), traced[0], traced[1])
+
+    @staticmethod
+    def start_tracing(frames: int = 1) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    @staticmethod
+    def snapshot() -> tracemalloc.Snapshot:
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not tracing; call start_tracing() first")
+        return tracemalloc.take_snapshot()
+
+    @staticmethod
+    def top_allocations(snapshot: tracemalloc.Snapshot, previous: Optional[tracemalloc.Snapshot] = None,
+                        limit: int = 10) -> List[str]:
+        """Largest allocation sites, or the largest growth since ``previous``."""
+        if previous is not None:
+            return [str(stat) for stat in snapshot.compare_to(previous, 'lineno')[:limit]]
+        return [str(stat) for stat in snapshot.statistics('lineno')[:limit]]
+
+    @staticmethod
+    def retained_objects(*types: type) -> Dict[str, int]:
+        """Live object counts per type name (all gc-tracked types when none are given)."""
+        counts: Dict[str, int] = {}
+        names = {t.__name__ for t in types}
+        for obj in gc.get_objects():
+            name = type(obj).__name__
+            if not names or name in names:
+                counts[name] = counts.get(name, 0) + 1
+        return counts
+
+    def close(self, delete_spilled: bool = False) -> None:
+        self.flush()
+        self._executor.shutdown(wait=True)
+        self.buffer.close(delete_spilled)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def benchmark_hub(events: int = 100_000, payload_size: int = 1024) -> None:
+    """Retained memory and dispatch throughput: MemoryLeakExample versus EventHub."""
+    from buggy_code import MemoryLeakExample
+
+    class Listener:
+        def __init__(self, source):
+            self.source = source            # back-reference, like a real subscriber
+            self.seen = 0
+
+        def on_event(self, event):
+            self.seen += 1
+
+    payload = 'x' * payload_size
+    tracemalloc.start()
+
+    legacy = MemoryLeakExample()
+    listener = Listener(legacy)
+    legacy.add_callback(listener.on_event)
+    start = time.perf_counter()
+    for i in range(events):
+        legacy.process_large_data(payload + str(i))
+        for callback in legacy.callbacks:
+            callback(i)
+    legacy_time = time.perf_counter() - start
+    legacy_memory = tracemalloc.get_traced_memory()[0]
+    del legacy, listener
+    gc.collect()
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+
+    with tempfile.TemporaryDirectory() as spill_dir:
+        buffer = SpillBuffer(max_bytes=4 * 1024 * 1024, spill_dir=spill_dir, max_spill_bytes=32 * 1024 * 1024)
+        with EventHub(buffer, batch_size=512) as hub:
+            listener = Listener(hub)
+            hub.subscribe(listener.on_event, weak=True)
+            start = time.perf_counter()
+            for i in range(events):
+                hub.process_large_data(payload + str(i))
+                hub.emit(i)
+            hub.flush()
+            hub_time = time.perf_counter() - start
+            stats = hub.stats()
+            del listener
+            gc.collect()
+            alive_after_del = hub.stats().callbacks
+
+    tracemalloc.stop()
+    print(f"MemoryLeakExample: {events / legacy_time:10,.0f} events/sec, "
+          f"{legacy_memory / 2 ** 20:8.1f} MiB retained")
+    print(f"EventHub         : {events / hub_time:10,.0f} events/sec, "
+          f"{(stats.traced_current - baseline) / 2 ** 20:8.1f} MiB retained, "
+          f"{stats.buffer.items} in memory, {stats.buffer.spilled_items} spilled, {stats.buffer.dropped} dropped, "
+          f"{stats.dispatched} dispatched, subscribers after del: {alive_after_del}")
+
+
+if __name__ == "__main__":
+    benchmark_hub()
@@ -0,0 +1,265 @@
+# expression_engine.py
+# Sandboxed, cached arithmetic expression evaluator
+# (safe replacement for VulnerableOSSUsage.calculate_expression)
+
+import ast
+import math
+import time
+from functools import lru_cache, reduce
+from typing import Dict, FrozenSet, Mapping, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; batch mode falls back to pure Python
+    np = None
+
+# Largest integer exponent accepted by ``**``; keeps 9**9**9 style inputs cheap
+MAX_EXPONENT = 1000
+# Largest integer result, in bits, that ``**`` and ``*`` may build; bounds nested powers
+MAX_RESULT_BITS = 1 << 16
+
+# Python values a scalar binding may hold; bool is an int
+_BINDING_TYPES = (int, float)
+
+_BINARY_OPERATORS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow)
+_UNARY_OPERATORS = (ast.UAdd, ast.USub)
+
+_SCALAR_FUNCTIONS = {
+    'abs': abs,
+    'min': min,
+    'max': max,
+    'round': round,
+    'sqrt': math.sqrt,
+    'floor': math.floor,
+    'ceil': math.ceil,
+}
+
+if np is not None:
+    _VECTOR_FUNCTIONS = {
+        'abs': np.abs,
+        'min': lambda *args: reduce(np.minimum, args),
+        'max': lambda *args: reduce(np.maximum, args),
+        'round': np.round,
+        'sqrt': np.sqrt,
+        'floor': np.floor,
+        'ceil': np.ceil,
+    }
+else:
+    _VECTOR_FUNCTIONS = {}
+
+
+class ExpressionError(ValueError):
+    """Raised when an expression is malformed or uses a disallowed construct."""
+
+
+def _guarded_pow(base, exponent):
+    """Power operator that refuses huge integer exponents and results, and complex results."""
+    if isinstance(exponent, int):
+        if abs(exponent) > MAX_EXPONENT:
+            raise ExpressionError(f"Exponent {exponent} exceeds limit of {MAX_EXPONENT}")
+        if isinstance(base, int) and base.bit_length() * exponent > MAX_RESULT_BITS:
+            raise ExpressionError(f"Result of ** exceeds limit of {MAX_RESULT_BITS} bits")
+    result = base ** exponent
+    if isinstance(result, complex):     # negative base, fractional exponent
+        raise ExpressionError(f"Negative base {base!r} with fractional exponent {exponent!r} has no real result")
+    return result
+
+
+def _guarded_mul(left, right):
+    """Multiplication that refuses integer products larger than MAX_RESULT_BITS."""
+    if (isinstance(left, int) and isinstance(right, int)
+            and left.bit_length() + right.bit_length() > MAX_RESULT_BITS + 1):
+        raise ExpressionError(f"Result of * exceeds limit of {MAX_RESULT_BITS} bits")
+    return left * right
+
+
+_GUARDS = {ast.Pow: '_pow', ast.Mult: '_mul'}
+
+
+class _Validator(ast.NodeTransformer):
+    """Rejects anything that is not plain arithmetic and rewrites ``**`` and ``*`` to guarded calls."""
+
+    def __init__(self):
+        self.names = set()
+
+    def generic_visit(self, node):
+        raise ExpressionError(f"Disallowed syntax: {type(node).__name__}")
+
+    def visit_Expression(self, node):
+        node.body = self.visit(node.body)
+        return node
+
+    def visit_Constant(self, node):
+        if type(node.value) not in (int, float):
+            raise ExpressionError(f"Disallowed constant: {node.value!r}")
+        return node
+
+    def visit_Name(self, node):
+        if node.id.startswith('_'):
+            raise ExpressionError(f"Disallowed name: {node.id}")
+        if node.id not in _SCALAR_FUNCTIONS:
+            self.names.add(node.id)
+        return node
+
+    def visit_UnaryOp(self, node):
+        if not isinstance(node.op, _UNARY_OPERATORS):
+            raise ExpressionError(f"Disallowed operator: {type(node.op).__name__}")
+        node.operand = self.visit(node.operand)
+        return node
+
+    def visit_BinOp(self, node):
+        if not isinstance(node.op, _BINARY_OPERATORS):
+            raise ExpressionError(f"Disallowed operator: {type(node.op).__name__}")
+        left = self.visit(node.left)
+        right = self.visit(node.right)
+        guard = _GUARDS.get(type(node.op))
+        if guard is not None:
+            call = ast.Call(func=ast.Name(id=guard, ctx=ast.Load()), args=[left, right], keywords=[])
+            return ast.copy_location(call, node)
+        node.left, node.right = left, right
+        return node
+
+    def visit_Call(self, node):
+        if not isinstance(node.func, ast.Name) or node.func.id not in _SCALAR_FUNCTIONS:
+            raise ExpressionError("Only whitelisted functions may be called")
+        if node.keywords:
+            raise ExpressionError("Keyword arguments are not allowed")
+        node.args = [self.visit(arg) for arg in node.args]
+        return node
+
+
+class CompiledExpression:
+    """An expression that has been parsed, validated and compiled once."""
+
+    __slots__ = ('source', 'variables', '_code')
+
+    def __init__(self, source: str, variables: FrozenSet[str], code):
+        self.source = source
+        self.variables = variables
+        self._code = code
+
+    def __repr__(self):
+        return f"CompiledExpression({self.source!r})"
+
+    def _namespace(self, functions: Dict, bindings: Mapping, scalars: bool = True) -> Dict:
+        missing = self.variables.difference(bindings)
+        if missing:
+            raise ExpressionError(f"Unbound variables: {', '.join(sorted(missing))}")
+        namespace = dict(functions)
+        namespace['_pow'] = _guarded_pow
+        namespace['_mul'] = _guarded_mul
+        for name in self.variables:
+            value = bindings[name]
+            if scalars and not isinstance(value, _BINDING_TYPES):
+                raise ExpressionError(f"Variable {name} must be an int, float or bool, "
+                                      f"not {type(value).__name__}")
+            namespace[name] = value
+        return namespace
+
+    def evaluate(self, bindings: Mapping = None, **kwargs):
+        """Evaluate against a mapping of variable bindings."""
+        if kwargs:
+            bindings = {**(bindings or {}), **kwargs}
+        return self._run(self._namespace(_SCALAR_FUNCTIONS, bindings or {}))
+
+    def _run(self, namespace: Dict):
+        try:
+            return eval(self._code, {'__builtins__': {}}, namespace)
+        except ExpressionError:
+            raise
+        except (ArithmeticError, TypeError, ValueError) as e:
+            raise ExpressionError(f"Cannot evaluate {self.source!r}: {e}") from e
+
+    def evaluate_many(self, columns: Mapping[str, Sequence]):
+        """Evaluate once per row over equally sized columns of values.
+
+        Uses a single vectorized NumPy evaluation when NumPy is installed and
+        returns an ndarray; otherwise returns a list.
+        """
+        missing = self.variables.difference(columns)
+        if missing:
+            raise ExpressionError(f"Missing columns: {', '.join(sorted(missing))}")
+        lengths = {len(columns[name]) for name in self.variables}
+        if len(lengths) > 1:
+            raise ExpressionError("All columns must have the same length")
+        if np is not None:
+            try:
+                arrays = {name: np.asarray(columns[name], dtype=float) for name in self.variables}
+            except (TypeError, ValueError) as e:
+                raise ExpressionError(f"Columns must be numeric: {e}") from e
+            result = self._run(self._namespace(_VECTOR_FUNCTIONS, arrays, scalars=False))
+            size = lengths.pop() if lengths else 1
+            return np.broadcast_to(result, (size,)).copy() if np.ndim(result) == 0 else result
+        if not self.variables:
+            value = self.evaluate()
+            return [value] * (lengths.pop() if lengths else 1)
+        names = sorted(self.variables)
+        rows = zip(*(columns[name] for name in names))
+        return [self.evaluate(dict(zip(names, row))) for row in rows]
+
+
+@lru_cache(maxsize=4096)
+def compile_expression(source: str) -> CompiledExpression:
+    """Parse and validate ``source`` into a restricted AST; results are cached by text."""
+    try:
+        tree = ast.parse(source.strip(), mode='eval')
+    except SyntaxError as e:
+        raise ExpressionError(f"Invalid expression: {e.msg}") from None
+    validator = _Validator()
+    tree = ast.fix_missing_locations(validator.visit(tree))
+    code = compile(tree, '<expression>', 'eval')
+    return CompiledExpression(source, frozenset(validator.names), code)
+
+
+def evaluate(source: str, bindings: Mapping = None, **kwargs):
+    """Compile (or fetch from cache) and evaluate an expression."""
+    return compile_expression(source).evaluate(bindings, **kwargs)
+
+
+def evaluate_many(source: str, columns: Mapping[str, Sequence]):
+    """Compile (or fetch from cache) and evaluate an expression over columns."""
+    return compile_expression(source).evaluate_many(columns)
+
+
+def benchmark_against_eval(iterations: int = 100000) -> Dict[str, float]:
+    """Compare raw ``eval`` with the cached engine on repeated and unique expressions."""
+    results = {}
+    repeated = "price * (1 - discount) + shipping"
+    bindings = {'price': 19.99, 'discount': 0.15, 'shipping': 4.5}
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        eval(repeated, {'__builtins__': {}}, bindings)
+    results['eval_repeated'] = time.perf_counter() - start
+
+    compile_expression.cache_clear()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        evaluate(repeated, bindings)
+    results['engine_repeated'] = time.perf_counter() - start
+
+    unique = [f"price * {i} + shipping / {i + 1}" for i in range(iterations // 10)]
+
+    start = time.perf_counter()
+    for expression in unique:
+        eval(expression, {'__builtins__': {}}, bindings)
+    results['eval_unique'] = time.perf_counter() - start
+
+    compile_expression.cache_clear()
+    start = time.perf_counter()
+    for expression in unique:
+        evaluate(expression, bindings)
+    results['engine_unique'] = time.perf_counter() - start
+
+    columns = {name: [value] * iterations for name, value in bindings.items()}
+    start = time.perf_counter()
+    evaluate_many(repeated, columns)
+    results['engine_batch'] = time.perf_counter() - start
+
+    return results
+
+
+if __name__ == "__main__":
+    print(evaluate("max(a, b) ** 2 - sqrt(c)", a=3, b=4, c=16))
+    for name, seconds in benchmark_against_eval().items():
+        print(f"{name:>16}: {seconds:.4f}s")
@@ -0,0 +1,614 @@
+# fetch_client.py
+# Pooled asyncio HTTP/1.1 JSON client with caching and request coalescing
+# (replacement for BuggyNetworkHandler.fetch_data)
+
+import asyncio
+import codecs
+import contextlib
+import hashlib
+import json
+import os
+import ssl
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+
+_MAX_LINE = 64 * 1024
+_READ_SIZE = 64 * 1024
+
+
+class FetchError(Exception):
+    """Raised for transport failures and non-2xx responses."""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class Response(NamedTuple):
+    status: int
+    headers: Dict[str, str]     # lower-cased names
+    body: bytes
+    from_cache: bool
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+
+class CacheEntry(NamedTuple):
+    etag: Optional[str]
+    expires: float              # wall-clock time after which the entry must be revalidated
+    headers: Dict[str, str]
+    body: bytes
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return (time.time() if now is None else now) < self.expires
+
+
+def parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    directives: Dict[str, Optional[str]] = {}
+    for part in (value or '').split(','):
+        name, _, argument = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = argument.strip('"') if argument else None
+    return directives
+
+
+def freshness_lifetime(headers: Dict[str, str], default: float = 0.0) -> Optional[float]:
+    """Seconds a response may be served without revalidation; None when it must not be stored."""
+    directives = parse_cache_control(headers.get('cache-control'))
+    if 'no-store' in directives:
+        return None
+    if 'no-cache' in directives:
+        return 0.0
+    try:
+        lifetime = float(directives['max-age'])
+    except (KeyError, TypeError, ValueError):
+        return default
+    try:
+        lifetime -= float(headers.get('age', 0))
+    except ValueError:
+        pass
+    return max(lifetime, 0.0)
+
+
+class ResponseCache:
+    """LRU of CacheEntry by URL, optionally backed by one file per URL in ``directory``."""
+
+    def __init__(self, max_entries: int = 1024, directory: Optional[str] = None):
+        self.max_entries = max_entries
+        self.directory = directory
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(url.encode('utf-8')).hexdigest())
+
+    def get(self, url: str, load: bool = True) -> Optional[CacheEntry]:
+        """Entry for ``url`` from memory, then (unless ``load`` is False) from its file."""
+        entry = self._entries.get(url)
+        if entry is not None:
+            self._entries.move_to_end(url)
+            return entry
+        if load and self.directory:
+            entry = self.load(url)
+            if entry is not None:
+                self._remember(url, entry)
+        return entry
+
+    def put(self, url: str, entry: CacheEntry, persist: bool = True) -> None:
+        """Cache ``entry`` in memory and, unless ``persist`` is False, on disk."""
+        self._remember(url, entry)
+        if persist:
+            self.persist(url, entry)
+
+    def persist(self, url: str, entry: CacheEntry) -> None:
+        """Write ``entry`` to its file only; touches no in-memory state, so it may run in a worker thread."""
+        if self.directory:
+            self._store(url, entry)
+
+    def _remember(self, url: str, entry: CacheEntry) -> None:
+        self._entries[url] = entry
+        self._entries.move_to_end(url)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def load(self, url: str) -> Optional[CacheEntry]:
+        """Read the entry's file only; touches no in-memory state, so it may run in a worker thread."""
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(url), 'rb') as f:
+                meta = json.loads(f.readline())
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        if meta.get('url') != url:
+            return None
+        return CacheEntry(meta['etag'], meta['expires'], meta['headers'], body)
+
+    def _store(self, url: str, entry: CacheEntry) -> None:
+        meta = {'url': url, 'etag': entry.etag, 'expires': entry.expires, 'headers': entry.headers}
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(json.dumps(meta).encode('utf-8') + b'\n')
+                f.write(entry.body)
+            os.replace(tmp, self._path(url))
+        except OSError:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class JsonArrayDecoder:
+    """Incrementally decodes the items of a top-level JSON array fed in byte chunks."""
+
+    def __init__(self):
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._started = False
+        self._expect_comma = False
+        self.done = False
+
+    def feed(self, chunk: bytes, final: bool = False) -> List[Any]:
+        self._buffer += self._utf8.decode(chunk, final)
+        buffer, pos, items = self._buffer, 0, []
+        length = len(buffer)
+        while not self.done:
+            while pos < length and buffer[pos] in ' \t\r\n':
+                pos += 1
+            if pos == length:
+                break
+            char = buffer[pos]
+            if not self._started:
+                if char != '[':
+                    raise ValueError("Response is not a JSON array")
+                self._started = True
+                pos += 1
+            elif char == ']':
+                self.done = True
+                pos += 1
+            elif self._expect_comma:
+                if char != ',':
+                    raise ValueError(f"Expected ',' in JSON array, got {char!r}")
+                self._expect_comma = False
+                pos += 1
+            else:
+                try:
+                    item, end = self._decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if final:
+                        raise
+                    break               # value continues in the next chunk
+                if not final and (end == length or buffer[end] not in ',] \t\r\n'):
+                    break               # a number may still be growing (e.g. "12" then ".5")
+                items.append(item)
+                pos = end
+                self._expect_comma = True
+        if self.done and buffer[pos:].strip(' \t\r\n'):
+            raise ValueError("Unexpected data after JSON array")
+        self._buffer = buffer[pos:] if not self.done else ''
+        if final and not self.done:
+            raise ValueError("Truncated JSON array")
+        return items
+
+
+class _Head(NamedTuple):
+    status: int
+    version: str
+    headers: Dict[str, str]
+
+    @property
+    def has_body(self) -> bool:
+        return not (self.status in (204, 304) or 100 <= self.status < 200)
+
+    @property
+    def keep_alive(self) -> bool:
+        connection = self.headers.get('connection', '').lower()
+        if self.version == 'HTTP/1.0':
+            return connection == 'keep-alive'
+        if connection == 'close':
+            return False
+        return (not self.has_body or 'content-length' in self.headers
+                or self.headers.get('transfer-encoding', '').lower() == 'chunked')
+
+
+class _Connection:
+    __slots__ = ('key', 'reader', 'writer', 'reused')
+
+    def __init__(self, key, reader, writer):
+        self.key = key
+        self.reader = reader
+        self.writer = writer
+        self.reused = False
+
+    def usable(self) -> bool:
+        return not self.writer.is_closing() and not self.reader.at_eof()
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class ConnectionPool:
+    """Keep-alive connections per (scheme, host, port), at most ``max_per_host`` in use at once."""
+
+    def __init__(self, max_per_host: int = 8, ssl_context: Optional[ssl.SSLContext] = None):
+        self.max_per_host = max_per_host
+        self.ssl_context = ssl_context
+        self._idle: Dict[Tuple[str, str, int], List[_Connection]] = {}
+        self._limits: Dict[Tuple[str, str, int], asyncio.Semaphore] = {}
+        self.opened = 0
+
+    async def acquire(self, key: Tuple[str, str, int]) -> _Connection:
+        limit = self._limits.get(key)
+        if limit is None:
+            limit = self._limits[key] = asyncio.Semaphore(self.max_per_host)
+        await limit.acquire()
+        idle = self._idle.get(key, [])
+        while idle:
+            conn = idle.pop()
+            if conn.usable():
+                conn.reused = True
+                return conn
+            conn.close()
+        scheme, host, port = key
+        context = None
+        if scheme == 'https':
+            context = self.ssl_context or ssl.create_default_context()
+        try:
+            reader, writer = await asyncio.open_connection(host, port, ssl=context, limit=_MAX_LINE)
+        except BaseException:
+            limit.release()
+            raise
+        self.opened += 1
+        return _Connection(key, reader, writer)
+
+    def release(self, conn: _Connection, reuse: bool) -> None:
+        if reuse and conn.usable():
+            self._idle.setdefault(conn.key, []).append(conn)
+        else:
+            conn.close()
+        self._limits[conn.key].release()
+
+    async def close(self) -> None:
+        for connections in self._idle.values():
+            for conn in connections:
+                conn.close()
+        self._idle.clear()
+
+
+class FetchClient:
+    """GET-only JSON client: pooled connections, HTTP caching and coalesced in-flight requests.
+
+    Fresh cache entries are served without touching the network; stale ones
+    carrying an ETag are revalidated with If-None-Match. Concurrent ``get``
+    calls for the same URL share one request.
+    """
+
+    def __init__(self, max_per_host: int = 8, timeout: float = 10.0, cache: Optional[ResponseCache] = None,
+                 coalesce: bool = True, default_max_age: float = 0.0,
+                 ssl_context: Optional[ssl.SSLContext] = None):
+        self.pool = ConnectionPool(max_per_host, ssl_context)
+        self.timeout = timeout
+        self.cache = cache
+        self.coalesce = coalesce
+        self.default_max_age = default_max_age
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {'fresh': 0, 'revalidated': 0, 'coalesced': 0, 'fetched': 0}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self) -> None:
+        await self.pool.close()
+
+    async def get(self, url: str) -> Response:
+        entry = await self._cached(url)
+        if entry is not None and entry.is_fresh():
+            self.stats['fresh'] += 1
+            return Response(200, entry.headers, entry.body, True)
+        if not self.coalesce:
+            return await self._fetch(url, entry)
+        task = self._inflight.get(url)
+        if task is not None:
+            self.stats['coalesced'] += 1
+        else:
+            task = asyncio.ensure_future(self._fetch(url, entry))
+            self._inflight[url] = task
+            task.add_done_callback(lambda done: self._inflight.pop(url, None)
+                                   if self._inflight.get(url) is done else None)
+        # shield: one cancelled caller must not cancel the request the others wait on
+        return await asyncio.shield(task)
+
+    async def fetch_json(self, url: str) -> Any:
+        """Parsed JSON body; raises FetchError on transport errors, non-2xx status or invalid JSON."""
+        response = await self.get(url)
+        if not 200 <= response.status < 300:
+            raise FetchError(f"GET {url} returned {response.status}", response.status)
+        try:
+            return response.json()
+        except ValueError as exc:
+            raise FetchError(f"GET {url} returned invalid JSON: {exc}", response.status) from exc
+
+    async def iter_json(self, url: str) -> AsyncIterator[Any]:
+        """Yield items of a JSON array response as they arrive; bypasses the cache.
+
+        ``timeout`` bounds sending the request and reading the head, and then
+        each body read separately, so a long stream is fine but a stalled one
+        is not. Failures raise FetchError, as in ``fetch_json``.
+        """
+        with self._transport_errors(url):
+            conn, head = await asyncio.wait_for(self._send(url, {}), self.timeout)
+        if not 200 <= head.status < 300:
+            with self._transport_errors(url):
+                await asyncio.wait_for(self._discard(conn, head), self.timeout)
+            raise FetchError(f"GET {url} returned {head.status}", head.status)
+        decoder = JsonArrayDecoder()
+        body = self._iter_body(conn, head)
+        reuse = False
+        try:
+            while True:
+                with self._transport_errors(url):
+                    try:
+                        chunk = await asyncio.wait_for(body.__anext__(), self.timeout)
+                    except StopAsyncIteration:
+                        break
+                    items = decoder.feed(chunk)
+                for item in items:
+                    yield item
+            with self._transport_errors(url):
+                items = decoder.feed(b'', final=True)
+            for item in items:
+                yield item
+            reuse = head.keep_alive
+        finally:
+            await body.aclose()
+            self.pool.release(conn, reuse)
+
+    @contextlib.contextmanager
+    def _transport_errors(self, url: str):
+        try:
+            yield
+        except asyncio.TimeoutError:
+            raise FetchError(f"GET {url} timed out after {self.timeout}s") from None
+        except (OSError, asyncio.IncompleteReadError, ValueError) as exc:
+            raise FetchError(f"GET {url} failed: {exc}") from exc
+
+    async def _fetch(self, url: str, entry: Optional[CacheEntry]) -> Response:
+        request_headers = {}
+        if entry is not None and entry.etag:
+            request_headers['If-None-Match'] = entry.etag
+        with self._transport_errors(url):
+            status, headers, body = await asyncio.wait_for(self._request(url, request_headers), self.timeout)
+        if status == 304 and entry is not None:
+            self.stats['revalidated'] += 1
+            merged = dict(entry.headers)
+            merged.update((k, v) for k, v in headers.items() if k != 'content-length')
+            entry = await self._store(url, merged, entry.body) or entry
+            return Response(200, entry.headers, entry.body, True)
+        self.stats['fetched'] += 1
+        if 200 <= status < 300:
+            await self._store(url, headers, body)
+        return Response(status, headers, body, False)
+
+    async def _cached(self, url: str) -> Optional[CacheEntry]:
+        if self.cache is None:
+            return None
+        entry = self.cache.get(url, load=False)
+        if entry is None and self.cache.directory:
+            # File reads block; keep them off the event loop
+            entry = await asyncio.get_running_loop().run_in_executor(None, self.cache.load, url)
+            if entry is not None:
+                # A response stored while the file was read is newer than the file
+                current = self.cache.get(url, load=False)
+                if current is not None:
+                    return current
+                self.cache.put(url, entry, persist=False)
+        return entry
+
+    async def _store(self, url: str, headers: Dict[str, str], body: bytes) -> Optional[CacheEntry]:
+        if self.cache is None:
+            return None
+        lifetime = freshness_lifetime(headers, self.default_max_age)
+        etag = headers.get('etag')
+        if lifetime is None or (lifetime == 0 and not etag):
+            return None
+        entry = CacheEntry(etag, time.time() + lifetime, headers, body)
+        self.cache.put(url, entry, persist=False)
+        if self.cache.directory:
+            # File writes block; keep them off the event loop
+            await asyncio.get_running_loop().run_in_executor(None, self.cache.persist, url, entry)
+        return entry
+
+    async def _request(self, url: str, extra_headers: Dict[str, str]) -> Tuple[int, Dict[str, str], bytes]:
+        conn, head = await self._send(url, extra_headers)
+        reuse = False
+        try:
+            body = b''.join([chunk async for chunk in self._iter_body(conn, head)])
+            reuse = head.keep_alive
+        finally:
+            self.pool.release(conn, reuse)
+        return head.status, head.headers, body
+
+    async def _send(self, url: str, extra_headers: Dict[str, str]):
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise ValueError(f"Unsupported URL: {url!r}")
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        key = (parts.scheme, parts.hostname, port)
+        # netloc may carry user:password@, which must not be sent
+        host = f"[{parts.hostname}]" if ':' in parts.hostname else parts.hostname
+        if parts.port is not None:
+            host = f"{host}:{parts.port}"
+        target = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+        lines = [f"GET {target} HTTP/1.1", f"Host: {host}", "Accept: application/json",
+                 "Accept-Encoding: identity", "Connection: keep-alive"]
+        lines.extend(f"{name}: {value}" for name, value in extra_headers.items())
+        request = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+        for attempt in (0, 1):
+            conn = await self.pool.acquire(key)
+            try:
+                conn.writer.write(request)
+                await conn.writer.drain()
+                return conn, await _read_head(conn.reader)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                self.pool.release(conn, False)
+                # A pooled keep-alive connection may have been closed by the server; retry once fresh
+                if not conn.reused or attempt:
+                    raise
+            except BaseException:
+                self.pool.release(conn, False)
+                raise
+
+    async def _iter_body(self, conn: _Connection, head: _Head) -> AsyncIterator[bytes]:
+        reader, headers = conn.reader, head.headers
+        if not head.has_body:
+            return
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            while True:
+                size_line = await reader.readuntil(b'\r\n')
+                size = int(size_line.split(b';', 1)[0], 16)
+                if size == 0:
+                    while await reader.readuntil(b'\r\n') != b'\r\n':
+                        pass            # trailers
+                    return
+                yield await reader.readexactly(size)
+                await reader.readexactly(2)
+        elif 'content-length' in headers:
+            remaining = int(headers['content-length'])
+            while remaining:
+                chunk = await reader.read(min(remaining, _READ_SIZE))
+                if not chunk:
+                    raise asyncio.IncompleteReadError(b'', remaining)
+                remaining -= len(chunk)
+                yield chunk
+        else:
+            while True:
+                chunk = await reader.read(_READ_SIZE)
+                if not chunk:
+                    return
+                yield chunk
+
+    async def _discard(self, conn: _Connection, head: _Head) -> None:
+        try:
+            async for _ in self._iter_body(conn, head):
+                pass
+            self.pool.release(conn, head.keep_alive)
+        except BaseException:
+            self.pool.release(conn, False)
+            raise
+
+
+async def _read_head(reader: asyncio.StreamReader) -> _Head:
+    status_line = (await reader.readuntil(b'\r\n')).decode('latin-1')
+    version, _, rest = status_line.partition(' ')
+    if not version.startswith('HTTP/1.'):
+        raise ValueError(f"Malformed status line: {status_line!r}")
+    status = int(rest.split(' ', 1)[0])
+    headers: Dict[str, str] = {}
+    while True:
+        line = await reader.readuntil(b'\r\n')
+        if line == b'\r\n':
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    return _Head(status, version, headers)
+
+
+def fetch_data(url: str, timeout: float = 10.0) -> Any:
+    """Blocking one-shot equivalent of BuggyNetworkHandler.fetch_data that raises FetchError."""
+    async def _run():
+        async with FetchClient(timeout=timeout) as client:
+            return await client.fetch_json(url)
+    return asyncio.run(_run())
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True     # headers and body are separate writes
+    max_age = 1
+
+    def do_GET(self):
+        size = int(self.path.rsplit('/', 1)[-1] or 1)
+        body = json.dumps([{'id': i, 'name': f"item{i}"} for i in range(size)]).encode('utf-8')
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()
+        time.sleep(0.002)       # simulated backend work
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', f"max-age={self.max_age}")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', f"max-age={self.max_age}")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def benchmark_fetch(requests_count: int = 3_000, endpoints: int = 20, concurrency: int = 50) -> None:
+    """Latency percentiles and cache hit ratio against a local stand-in server."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _StandInHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    urls = [f"{base}/items/{10 + i * 5}" for i in range(endpoints)]
+
+    async def workload(client: FetchClient) -> List[float]:
+        latencies: List[float] = []
+        queue = iter(range(requests_count))
+
+        async def worker():
+            for n in queue:
+                start = time.perf_counter()
+                await client.fetch_json(urls[n % endpoints])
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return latencies
+
+    async def run(label: str, client: FetchClient) -> None:
+        async with client:
+            start = time.perf_counter()
+            latencies = sorted(await workload(client))
+            elapsed = time.perf_counter() - start
+        served = client.stats['fresh'] + client.stats['revalidated'] + client.stats['coalesced']
+        print(f"{label:>10}: {requests_count / elapsed:8,.0f} req/s  "
+              f"p50={_percentile(latencies, 0.5) * 1e3:6.2f}ms  p95={_percentile(latencies, 0.95) * 1e3:6.2f}ms  "
+              f"p99={_percentile(latencies, 0.99) * 1e3:6.2f}ms  hit ratio={served / requests_count:.1%}  "
+              f"connections={client.pool.opened}  {client.stats}")
+
+    try:
+        asyncio.run(run('no cache', FetchClient(cache=None, coalesce=False)))
+        asyncio.run(run('cached', FetchClient(cache=ResponseCache())))
+        with tempfile.TemporaryDirectory() as directory:
+            asyncio.run(run('disk', FetchClient(cache=ResponseCache(directory=directory))))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    benchmark_fetch()
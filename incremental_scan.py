@@ -0,0 +1,255 @@
+# incremental_scan.py
+# Persistent, incremental front end for source_scanner: only changed files are re-scanned
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+import source_scanner
+from source_scanner import Finding, analyze_payloads, content_hash, iter_python_files, ruleset_digest
+
+CACHE_FILENAME = '.vendor_check_cache.json'
+CACHE_VERSION = 1
+
+
+class CacheEntry(NamedTuple):
+    mtime_ns: int
+    size: int
+    digest: str
+    findings: List[tuple]
+    imports: List[str]
+
+
+class IncrementalResult(NamedTuple):
+    findings: List[Finding]
+    rescanned: int
+    reused: int
+    removed: int
+    elapsed: float
+
+
+def module_name(relpath: str) -> str:
+    """Dotted module name for a path relative to the scan root."""
+    parts = relpath[:-3].replace(os.sep, '/').split('/')
+    if parts[-1] == '__init__':
+        parts.pop()
+    return '.'.join(parts)
+
+
+def _resolve_relative(importer: str, name: str) -> str:
+    level = len(name) - len(name.lstrip('.'))
+    package = module_name(importer).split('.')
+    if not importer.endswith('__init__.py'):
+        package.pop()
+    base = package[:len(package) - (level - 1)] if level > 1 else package
+    rest = name[level:]
+    return '.'.join(base + ([rest] if rest else []))
+
+
+class IncrementalScanCache:
+    """On-disk scan results keyed by relative path, checked by mtime, size and content hash."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.ruleset = ruleset_digest()
+        self.entries: Dict[str, CacheEntry] = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+            if payload.get('version') == CACHE_VERSION and payload.get('ruleset') == self.ruleset:
+                self.entries = {relpath: CacheEntry(*entry) for relpath, entry in payload['files'].items()}
+
+    def save(self) -> None:
+        payload = {
+            'version': CACHE_VERSION,
+            'ruleset': self.ruleset,
+            'files': {relpath: list(entry) for relpath, entry in self.entries.items()},
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, self.path)
+
+    def dependents(self, relpaths: Iterable[str]) -> Set[str]:
+        """Files that import any of ``relpaths``, directly or transitively."""
+        modules = {module_name(relpath): relpath for relpath in self.entries}
+        reverse: Dict[str, Set[str]] = {}
+        for importer, entry in self.entries.items():
+            for name in entry.imports:
+                target = _resolve_relative(importer, name) if name.startswith('.') else name
+                # ``import a.b`` also runs ``a/__init__.py``
+                while target:
+                    if target in modules:
+                        reverse.setdefault(modules[target], set()).add(importer)
+                    target = target.rpartition('.')[0]
+        pending = list(relpaths)
+        seen: Set[str] = set()
+        while pending:
+            for importer in reverse.get(pending.pop(), ()):
+                if importer not in seen:
+                    seen.add(importer)
+                    pending.append(importer)
+        return seen
+
+
+def changed_files_since(root: str, rev: str) -> List[str]:
+    """Python files changed since ``rev`` (plus untracked ones), relative to ``root``."""
+    def git(*args):
+        output = subprocess.run(['git', '-C', root, *args], check=True, capture_output=True, text=True).stdout
+        return [line for line in output.splitlines() if line]
+
+    # Without --no-renames a rename lists only its new path and the old one stays cached
+    changed = git('diff', '--name-only', '--no-renames', '--relative', rev, '--')
+    changed += git('ls-files', '--others', '--exclude-standard')
+    return sorted({os.path.normpath(p) for p in changed if p.endswith('.py')})
+
+
+def python_paths_under(root: str, paths: Iterable[str]) -> List[str]:
+    """``paths`` that are Python files inside ``root``, relative to it; others are dropped."""
+    selected = set()
+    for path in paths:
+        relpath = os.path.normpath(os.path.relpath(os.path.join(root, path), root))
+        if relpath.endswith('.py') and not os.path.isabs(relpath) and relpath.split(os.sep)[0] != os.pardir:
+            selected.add(relpath)
+    return sorted(selected)
+
+
+def scan_incremental(root: str, cache: IncrementalScanCache, changed: Optional[Iterable[str]] = None,
+                     with_dependents: bool = False, processes: Optional[int] = None) -> IncrementalResult:
+    """Re-scan only what changed and merge with cached findings for everything else.
+
+    With ``changed=None`` every file is checked by mtime/size, falling back to a
+    content hash. With an explicit list (e.g. from ``--since``) only those files
+    are examined; an empty cache always triggers a full walk.
+    """
+    start = time.perf_counter()
+    if changed is None or not cache.entries:
+        candidates = [os.path.relpath(path, root) for path in iter_python_files(root)]
+        removed = set(cache.entries).difference(candidates)
+    else:
+        candidates = []
+        removed = set()
+        for relpath in changed:
+            relpath = os.path.normpath(os.path.relpath(os.path.join(root, relpath), root))
+            if os.path.isfile(os.path.join(root, relpath)):
+                candidates.append(relpath)
+            elif relpath in cache.entries:
+                removed.add(relpath)
+
+    # Dependents of deleted files must be found while the deleted entries are still indexed
+    orphaned = cache.dependents(removed) if with_dependents and removed else set()
+    for relpath in removed:
+        del cache.entries[relpath]
+
+    stale: Dict[str, tuple] = {}
+    for relpath in candidates:
+        full_path = os.path.join(root, relpath)
+        stat = os.stat(full_path)
+        entry = cache.entries.get(relpath)
+        if entry is not None and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+            continue
+        with open(full_path, 'rb') as f:
+            data = f.read()
+        digest = content_hash(data)
+        if entry is not None and entry.digest == digest:
+            cache.entries[relpath] = entry._replace(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+            continue
+        stale[relpath] = (stat, digest, data)
+
+    if with_dependents and (stale or orphaned):
+        for relpath in cache.dependents(stale) | orphaned:
+            if relpath not in stale and relpath in cache.entries:
+                full_path = os.path.join(root, relpath)
+                with open(full_path, 'rb') as f:
+                    data = f.read()
+                stale[relpath] = (os.stat(full_path), content_hash(data), data)
+
+    payloads = [(relpath, data) for relpath, (_, _, data) in stale.items()]
+    for (relpath, (stat, digest, _)), (findings, imports) in zip(stale.items(), analyze_payloads(payloads, processes)):
+        cache.entries[relpath] = CacheEntry(
+            stat.st_mtime_ns, stat.st_size, digest,
+            [(f.line, f.col, f.rule_id, f.message) for f in findings], imports)
+
+    merged = [Finding(relpath, *item) for relpath in sorted(cache.entries) for item in cache.entries[relpath].findings]
+    return IncrementalResult(merged, len(stale), len(cache.entries) - len(stale), len(removed),
+                             time.perf_counter() - start)
+
+
+def benchmark_cold_vs_warm(file_count: int = 10000, changed_count: int = 10) -> None:
+    """Cold, warm and changed-files-only scans over a generated ``file_count`` tree."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    sources = [os.path.join(here, name) for name in source_scanner.GOLDEN_CORPUS]
+    with tempfile.TemporaryDirectory() as root:
+        for i in range(file_count):
+            package = os.path.join(root, f"pkg{i // 200}")
+            os.makedirs(package, exist_ok=True)
+            target = os.path.join(package, f"module_{i}.py")
+            shutil.copyfile(sources[i % len(sources)], target)
+            with open(target, 'a', encoding='utf-8') as f:
+                f.write(f"\n_VARIANT = {i}\n")
+
+        cache = IncrementalScanCache(os.path.join(root, CACHE_FILENAME))
+        cold = scan_incremental(root, cache)
+        cache.save()
+
+        cache = IncrementalScanCache(cache.path)
+        warm = scan_incremental(root, cache)
+
+        touched = [os.path.join(f"pkg{i // 200}", f"module_{i}.py") for i in range(changed_count)]
+        for relpath in touched:
+            with open(os.path.join(root, relpath), 'a', encoding='utf-8') as f:
+                f.write("_TOUCHED = True\n")
+        changed = scan_incremental(root, cache, changed=touched)
+
+        for label, result in (('cold', cold), ('warm', warm), ('changed-only', changed)):
+            print(f"{label:>12}: {result.elapsed:8.3f}s, {result.rescanned} re-scanned, "
+                  f"{result.reused} reused, {len(result.findings)} findings")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Incrementally scan a vendor source tree.")
+    parser.add_argument('root', nargs='?', default='.', help="tree to scan (default: current directory)")
+    parser.add_argument('--cache', help=f"cache file (default: <root>/{CACHE_FILENAME})")
+    parser.add_argument('--since', metavar='GIT_REV', help="only re-scan files changed since this revision")
+    parser.add_argument('--files', nargs='+', metavar='PATH', help="only re-scan these files")
+    parser.add_argument('--files-from', metavar='LIST', help="read files to re-scan from LIST ('-' for stdin)")
+    parser.add_argument('--with-dependents', action='store_true',
+                        help="also re-scan files that import a changed file")
+    parser.add_argument('--processes', type=int, help="worker processes for re-scans")
+    parser.add_argument('--benchmark', action='store_true', help="run the cold vs warm benchmark and exit")
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        benchmark_cold_vs_warm()
+        return 0
+
+    changed = None
+    if args.since or args.files or args.files_from:
+        changed = list(args.files or [])
+        if args.since:
+            changed += changed_files_since(args.root, args.since)
+        if args.files_from:
+            stream = sys.stdin if args.files_from == '-' else open(args.files_from, 'r', encoding='utf-8')
+            with stream:
+                changed += [line.strip() for line in stream if line.strip()]
+        changed = python_paths_under(args.root, changed)
+
+    cache = IncrementalScanCache(args.cache or os.path.join(args.root, CACHE_FILENAME))
+    result = scan_incremental(args.root, cache, changed, args.with_dependents, args.processes)
+    cache.save()
+
+    for finding in result.findings:
+        print(f"{finding.path}:{finding.line}:{finding.col}: {finding.rule_id} {finding.message}")
+    print(f"{len(result.findings)} findings; {result.rescanned} files re-scanned, "
+          f"{result.reused} reused, {result.removed} removed in {result.elapsed:.3f}s", file=sys.stderr)
+    return 1 if result.findings else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,443 @@
+# manifest_scanner.py
+# Streaming requirements parser and CVE advisory index for vendor manifests
+
+import ast
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+_NAME_RE = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)\s*(?:\[[^\]]*\])?\s*(.*)$")
+_SPECIFIER_RE = re.compile(r"^\s*(===|~=|==|!=|<=|>=|<|>)\s*([^\s,;]+)\s*$")
+_ADVISORY_RE = re.compile(r"\b(CVE-\d{4}-\d{4,}|GHSA(?:-[0-9a-z]{4}){3})\b", re.IGNORECASE)
+_NORMALIZE_RE = re.compile(r"[-_.]+")
+_RELEASE_RE = re.compile(r"^v?(\d+(?:\.\d+)*)(.*)$")
+_WILDCARD_RE = re.compile(r"^v?\d+(?:\.\d+)*\.\*$")
+_SUFFIX_RE = re.compile(r"^(?:[-_.]?(a|alpha|b|beta|c|rc|pre|preview)[-_.]?(\d*))?"
+                        r"(?:[-_.]?(post|rev|r)[-_.]?(\d*)|-(\d+))?"
+                        r"(?:[-_.]?(dev)[-_.]?(\d*))?$")
+_PRE_PHASES = {"a": 0, "alpha": 0, "b": 1, "beta": 1, "c": 2, "rc": 2, "pre": 2, "preview": 2}
+_OPTION_RE = re.compile(r"\s--[A-Za-z]")
+
+# SQLite maps up to this many bytes of the index file instead of reading it
+MMAP_SIZE = 256 * 1024 * 1024
+
+Specifier = Tuple[str, str]
+
+
+class Requirement(NamedTuple):
+    name: str
+    normalized: str
+    specifiers: Tuple[Specifier, ...]
+    advisories: Tuple[str, ...]
+    line_no: int
+
+
+class ManifestReport(NamedTuple):
+    path: str
+    requirement_count: int
+    findings: List[Tuple[Requirement, Tuple[str, ...]]]
+    errors: Tuple[Tuple[int, str], ...] = ()    # (line number, message); line 0 for the whole file
+
+
+class ScanSummary(NamedTuple):
+    reports: List[ManifestReport]
+    elapsed: float
+    manifests_per_sec: float
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a project name per PEP 503."""
+    return _NORMALIZE_RE.sub("-", name).lower()
+
+
+def version_key(version: str) -> Tuple:
+    """Sort key for a version string in PEP 440 order: dev < pre-release < final < post.
+
+    Key is ``(release, pre, post, dev, local)``; suffixes that are not PEP 440
+    sort before the final release and compare as text.
+    """
+    version, _, local = version.strip().lower().partition("+")
+    match = _RELEASE_RE.match(version)
+    if not match:
+        return ((), (-2, 0), -1, (1, 0), version)
+    release = [int(part) for part in match.group(1).split(".")]
+    while len(release) > 1 and release[-1] == 0:
+        release.pop()
+    suffix = match.group(2)
+    parts = _SUFFIX_RE.match(suffix)
+    if not parts:
+        return (tuple(release), (-2, 0), -1, (1, 0), suffix)
+    phase, pre_number, post, post_number, implicit_post, dev, dev_number = parts.groups()
+    if phase:
+        pre = (_PRE_PHASES[phase], int(pre_number or 0))
+    elif dev and not (post or implicit_post):
+        pre = (-1, 0)           # 1.0.dev1 sorts before 1.0a1
+    else:
+        pre = (3, 0)
+    if implicit_post:
+        post_key = int(implicit_post)
+    else:
+        post_key = int(post_number or 0) if post else -1
+    dev_key = (0, int(dev_number or 0)) if dev else (1, 0)
+    return (tuple(release), pre, post_key, dev_key, local)
+
+
+def parse_specifiers(text: str) -> Tuple[Specifier, ...]:
+    """Parse ``>=1.0,<2`` style specifiers, optionally parenthesised, into (operator, version) pairs."""
+    text = text.strip()
+    if text.startswith("(") and text.endswith(")"):
+        text = text[1:-1]
+    specifiers = []
+    for part in text.split(","):
+        if not part.strip():
+            continue
+        match = _SPECIFIER_RE.match(part)
+        if not match:
+            raise ValueError(f"Invalid version specifier: {part.strip()!r}")
+        op, target = match.groups()
+        if "*" in target and (op not in ("==", "!=") or not _WILDCARD_RE.match(target)):
+            raise ValueError(f"Invalid version specifier: {part.strip()!r}")
+        if op == "~=" and len(_release(target)) < 2:
+            raise ValueError(f"~= needs at least two release segments: {part.strip()!r}")
+        specifiers.append((op, target))
+    return tuple(specifiers)
+
+
+def _release(version: str) -> Tuple[int, ...]:
+    # Release segments as written; version_key drops trailing zeros, which prefixes must keep
+    match = _RELEASE_RE.match(version.strip().lower())
+    return tuple(int(part) for part in match.group(1).split(".")) if match else ()
+
+
+def _has_prefix(version: Tuple, prefix: Tuple[int, ...]) -> bool:
+    # PEP 440 prefix match: release segments only, the candidate padded with zeros
+    release = version[0] + (0,) * (len(prefix) - len(version[0]))
+    return release[:len(prefix)] == prefix
+
+
+def _equal(version: Tuple, target: str) -> bool:
+    if target.endswith(".*"):
+        return _has_prefix(version, _release(target[:-2]))
+    return version == version_key(target)
+
+
+def _compatible(version: Tuple, target: str) -> bool:
+    # ~=1.4.2 is >=1.4.2, ==1.4.*
+    return version >= version_key(target) and _has_prefix(version, _release(target)[:-1])
+
+
+_OPERATORS = {
+    "==": _equal,
+    "===": lambda v, t: v == version_key(t),
+    "!=": lambda v, t: not _equal(v, t),
+    "<=": lambda v, t: v <= version_key(t),
+    ">=": lambda v, t: v >= version_key(t),
+    "<": lambda v, t: v < version_key(t),
+    ">": lambda v, t: v > version_key(t),
+    "~=": _compatible,
+}
+
+
+def specifiers_match(version: str, specifiers: Sequence[Specifier]) -> bool:
+    """True if ``version`` satisfies every specifier."""
+    key = version_key(version)
+    return all(_OPERATORS[op](key, target) for op, target in specifiers)
+
+
+def _first_with_prefix(prefix: Tuple[int, ...]) -> Tuple:
+    return version_key(".".join(map(str, prefix)) + ".dev0")
+
+
+def _bounds(specifiers: Sequence[Specifier]) -> Tuple[List, List]:
+    # (key, inclusive) lower and upper bounds; != excludes single points and is left out
+    lower, upper = [], []
+    for op, target in specifiers:
+        if op in ("==", "===") and target.endswith(".*"):
+            prefix = _release(target[:-2])
+            lower.append((_first_with_prefix(prefix), True))
+            upper.append((_first_with_prefix(prefix[:-1] + (prefix[-1] + 1,)), False))
+        elif op in ("==", "==="):
+            lower.append((version_key(target), True))
+            upper.append((version_key(target), True))
+        elif op in (">=", ">"):
+            lower.append((version_key(target), op == ">="))
+        elif op in ("<=", "<"):
+            upper.append((version_key(target), op == "<="))
+        elif op == "~=":
+            prefix = _release(target)[:-1]
+            lower.append((version_key(target), True))
+            if prefix:
+                upper.append((_first_with_prefix(prefix[:-1] + (prefix[-1] + 1,)), False))
+    return lower, upper
+
+
+def specifiers_overlap(first: Sequence[Specifier], second: Sequence[Specifier]) -> bool:
+    """True if some version could satisfy both specifier sets.
+
+    Versions are dense, so any open interval is non-empty; ``!=`` only
+    matters when the sets meet in a single version.
+    """
+    lower, upper = _bounds(tuple(first) + tuple(second))
+    if not lower or not upper:
+        return True
+    low, low_inclusive = max(lower, key=lambda bound: (bound[0], not bound[1]))
+    high, high_inclusive = min(upper, key=lambda bound: (bound[0], bound[1]))
+    if low < high:
+        return True
+    if low == high and low_inclusive and high_inclusive:
+        return all(_OPERATORS[op](low, target) for op, target in tuple(first) + tuple(second))
+    return False
+
+
+def pinned_version(requirement: Requirement) -> Optional[str]:
+    """Return the exact version a requirement pins, if any."""
+    for op, version in requirement.specifiers:
+        if op in ("==", "===") and "*" not in version:
+            return version
+    return None
+
+
+def parse_requirement(line: str, line_no: int = 0) -> Optional[Requirement]:
+    """Parse one requirements line; returns None for blanks, comments and options.
+
+    Per-requirement options such as ``--hash=sha256:...`` are ignored.
+    Raises ValueError for a malformed version specifier.
+    """
+    body, _, comment = line.partition("#")
+    body = body.split(";", 1)[0]
+    option = _OPTION_RE.search(body)
+    if option:
+        body = body[:option.start()]
+    body = body.strip()
+    if not body or body.startswith("-") or "://" in body:
+        return None
+    match = _NAME_RE.match(body)
+    if not match:
+        return None
+    name, rest = match.groups()
+    advisories = tuple(a.upper() for a in _ADVISORY_RE.findall(comment))
+    return Requirement(name, normalize_name(name), parse_specifiers(rest), advisories, line_no)
+
+
+def iter_logical_lines(lines: Iterable[str]) -> Iterator[Tuple[int, str]]:
+    """``(line_no, line)`` with backslash continuations joined; numbered by their first line."""
+    pending = []
+    first = 0
+    for line_no, line in enumerate(lines, 1):
+        line = line.rstrip("\r\n")
+        if not pending:
+            first = line_no
+        if line.endswith("\\"):
+            pending.append(line[:-1])
+            continue
+        pending.append(line)
+        yield first, "".join(pending)
+        pending = []
+    if pending:
+        yield first, "".join(pending)
+
+
+def iter_requirements(source: Union[str, os.PathLike, Iterable[str]]) -> Iterator[Requirement]:
+    """Stream requirements from a file path or any iterable of lines."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "r", encoding="utf-8", errors="replace") as f:
+            yield from iter_requirements(f)
+        return
+    for line_no, line in iter_logical_lines(source):
+        requirement = parse_requirement(line, line_no)
+        if requirement is not None:
+            yield requirement
+
+
+def read_embedded_requirements(path: str, variable: str = "VULNERABLE_REQUIREMENTS") -> List[str]:
+    """Read a module-level requirements string without importing the module."""
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    for node in tree.body:
+        if (isinstance(node, ast.Assign) and isinstance(node.value, ast.Constant)
+                and any(isinstance(t, ast.Name) and t.id == variable for t in node.targets)):
+            return node.value.value.splitlines()
+    raise LookupError(f"{variable} not found in {path}")
+
+
+# ==================== ADVISORY INDEX ====================
+
+def advisories_from_requirements(sources: Iterable) -> Dict[str, List[Tuple[Tuple[Specifier, ...], Tuple[str, ...]]]]:
+    """Collect advisories from annotated requirement lists (``pkg==1.0  # CVE-...``)."""
+    records = {}
+    for source in sources:
+        for requirement in iter_requirements(source):
+            if requirement.advisories and requirement.specifiers:
+                entry = (requirement.specifiers, requirement.advisories)
+                bucket = records.setdefault(requirement.normalized, [])
+                if entry not in bucket:
+                    bucket.append(entry)
+    return records
+
+
+def build_index(records: Dict, path: str) -> str:
+    """Write an advisory index to ``path``; ``.json`` writes JSON, anything else SQLite."""
+    if path.endswith(".json"):
+        payload = {name: [[[list(s) for s in specs], list(ids)] for specs, ids in entries]
+                   for name, entries in records.items()}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        return path
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("CREATE TABLE advisories (name TEXT NOT NULL, specifiers TEXT NOT NULL, ids TEXT NOT NULL)")
+        conn.executemany(
+            "INSERT INTO advisories VALUES (?, ?, ?)",
+            ((name, json.dumps(specs), json.dumps(ids)) for name, entries in records.items() for specs, ids in entries))
+        conn.execute("CREATE INDEX advisories_name ON advisories (name)")
+        conn.commit()
+    finally:
+        conn.close()
+    return path
+
+
+class AdvisoryIndex:
+    """Package-name keyed advisory lookups backed by a JSON or memory-mapped SQLite file."""
+
+    def __init__(self, records: Dict = None, connection: sqlite3.Connection = None):
+        self._records = records
+        self._connection = connection
+        self._cache = {}
+
+    @classmethod
+    def load(cls, path: str) -> "AdvisoryIndex":
+        if path.endswith(".json"):
+            with open(path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+            records = {name: [(tuple(tuple(s) for s in specs), tuple(ids)) for specs, ids in entries]
+                       for name, entries in payload.items()}
+            return cls(records=records)
+        connection = sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True)
+        connection.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        return cls(connection=connection)
+
+    def _entries(self, normalized: str):
+        if self._records is not None:
+            return self._records.get(normalized, ())
+        entries = self._cache.get(normalized)
+        if entries is None:
+            rows = self._connection.execute(
+                "SELECT specifiers, ids FROM advisories WHERE name = ?", (normalized,)).fetchall()
+            entries = [(tuple(tuple(s) for s in json.loads(specs)), tuple(json.loads(ids))) for specs, ids in rows]
+            self._cache[normalized] = entries
+        return entries
+
+    def lookup(self, requirement: Requirement) -> Tuple[str, ...]:
+        """Advisory IDs affecting a requirement.
+
+        A pinned version must fall in the advisory's range; an unpinned
+        requirement matches when its specifiers allow some version in it.
+        """
+        version = pinned_version(requirement)
+        matched = []
+        for specifiers, ids in self._entries(requirement.normalized):
+            if version is not None:
+                affected = specifiers_match(version, specifiers)
+            else:
+                affected = specifiers_overlap(requirement.specifiers, specifiers)
+            if affected:
+                matched.extend(i for i in ids if i not in matched)
+        return tuple(matched)
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+def scan_manifest(path: str, index: AdvisoryIndex) -> ManifestReport:
+    """Stream one manifest and look every requirement up in the index.
+
+    Unparseable lines and unreadable files are reported in ``errors``
+    rather than raised, so one bad manifest cannot abort a batch.
+    """
+    findings = []
+    errors = []
+    count = 0
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line_no, line in iter_logical_lines(f):
+                try:
+                    requirement = parse_requirement(line, line_no)
+                except ValueError as e:
+                    errors.append((line_no, str(e)))
+                    continue
+                if requirement is None:
+                    continue
+                count += 1
+                advisories = index.lookup(requirement)
+                if advisories:
+                    findings.append((requirement, advisories))
+    except OSError as e:
+        errors.append((0, str(e)))
+    return ManifestReport(str(path), count, findings, tuple(errors))
+
+
+_worker_index = None
+
+
+def _init_worker(index_path: str) -> None:
+    global _worker_index
+    _worker_index = AdvisoryIndex.load(index_path)
+
+
+def _scan_in_worker(path: str) -> ManifestReport:
+    return scan_manifest(path, _worker_index)
+
+
+def scan_manifests(paths: Sequence[str], index_path: str, processes: Optional[int] = None,
+                   chunksize: int = 64) -> ScanSummary:
+    """Scan many manifests across worker processes, each loading the index once."""
+    start = time.perf_counter()
+    if processes == 1:
+        index = AdvisoryIndex.load(index_path)
+        try:
+            reports = [scan_manifest(path, index) for path in paths]
+        finally:
+            index.close()
+    else:
+        with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(index_path,)) as pool:
+            reports = list(pool.map(_scan_in_worker, paths, chunksize=chunksize))
+    elapsed = time.perf_counter() - start
+    return ScanSummary(reports, elapsed, len(paths) / elapsed if elapsed else float("inf"))
+
+
+def benchmark_scan(manifest_count: int = 2000) -> None:
+    """Build an index from this project's manifests and scan generated copies of them."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    requirements = os.path.join(here, "requirements.txt")
+    embedded = read_embedded_requirements(os.path.join(here, "oss_vulnerabilities.py"))
+    records = advisories_from_requirements([requirements, embedded])
+
+    with open(requirements, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    with tempfile.TemporaryDirectory() as workdir:
+        index_path = build_index(records, os.path.join(workdir, "advisories.sqlite"))
+        paths = []
+        for i in range(manifest_count):
+            path = os.path.join(workdir, f"requirements-{i}.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.writelines(lines[i % 7:])
+            paths.append(path)
+
+        for processes in (1, None):
+            summary = scan_manifests(paths, index_path, processes=processes)
+            findings = sum(len(r.findings) for r in summary.reports)
+            label = "serial" if processes == 1 else "parallel"
+            print(f"{label:>8}: {summary.manifests_per_sec:10.1f} manifests/sec, {findings} findings")
+
+
+if __name__ == "__main__":
+    benchmark_scan()
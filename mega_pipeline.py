@@ -0,0 +1,151 @@
+# mega_pipeline.py
+# Staged, chunked and optionally parallel engine for code_quality_issue.mega_function
+
+import math
+import os
+import random
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; stages fall back to comprehensions
+    np = None
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+
+class MegaSummary(NamedTuple):
+    result: List[float]
+    total: float
+    count: int
+    positive_sum: float  # sum of the cleaned inputs (mega_function's intermediate sum)
+
+
+def validate(param1: str, values: Iterable) -> Tuple[str, Iterator]:
+    """Check inputs without materializing ``values``; returns the cleaned label and an iterator."""
+    if not param1 or not isinstance(param1, str):
+        raise ValueError("Invalid input")
+    iterator = iter(values)
+    try:
+        first = next(iterator)
+    except StopIteration:
+        raise ValueError("Invalid input") from None
+    return param1.strip().lower(), chain((first,), iterator)
+
+
+def iter_chunks(values: Iterable, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[list]:
+    iterator = iter(values)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def summarize_chunk(chunk: Sequence[float], multiplier: float, threshold: float, factor: float) -> MegaSummary:
+    """Clean and transform one chunk, returning its results with partial aggregates."""
+    if np is not None:
+        values = np.asarray(chunk, dtype=float)
+        positive = values[values > 0]
+        scaled = positive * multiplier
+        result = np.where(scaled > threshold, scaled, scaled * factor)
+        return MegaSummary(result.tolist(), float(result.sum()), int(result.size), float(positive.sum()))
+    positive = [x for x in chunk if x > 0]
+    result = [t if t > threshold else t * factor for t in [x * multiplier for x in positive]]
+    return MegaSummary(result, sum(result), len(result), sum(positive))
+
+
+def _summarize_args(args):
+    return summarize_chunk(*args)
+
+
+def iter_summaries(values: Iterable, multiplier: float, threshold: float, factor: float,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tuple[List[float], float, int]]:
+    """Stream ``(chunk_result, running_total, running_count)`` in a single pass over ``values``."""
+    total, count = 0.0, 0
+    for chunk in iter_chunks(values, chunk_size):
+        part = summarize_chunk(chunk, multiplier, threshold, factor)
+        total += part.total
+        count += part.count
+        yield part.result, total, count
+
+
+def _map_bounded(pool: ProcessPoolExecutor, fn, items: Iterable, window: int) -> Iterator:
+    """Ordered ``pool.map`` that keeps at most ``window`` items in flight.
+
+    Executor.map (like Pool.imap's feeder thread) drains its whole input up
+    front; this pulls the next chunk only as results are taken.
+    """
+    pending = deque()
+    for item in items:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def merge_summaries(parts: Iterable[MegaSummary]) -> MegaSummary:
+    result: List[float] = []
+    total = positive_sum = 0.0
+    count = 0
+    for part in parts:
+        result.extend(part.result)
+        total += part.total
+        count += part.count
+        positive_sum += part.positive_sum
+    return MegaSummary(result, total, count, positive_sum)
+
+
+def run(param1: str, param2: Iterable, param3: float, param4: float, param5: float,
+        processes: Optional[int] = 1, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict:
+    """Drop-in equivalent of mega_function's output, computed chunk by chunk.
+
+    ``processes`` other than 1 sends chunks to worker processes (None uses
+    every CPU) and merges their partial summaries in input order. Either way
+    input is read and merged one chunk at a time; only a few chunks per
+    worker are in flight.
+    """
+    cleaned, values = validate(param1, param2)
+    chunks = iter_chunks(values, chunk_size)
+    if processes == 1:
+        summary = merge_summaries(summarize_chunk(c, param3, param4, param5) for c in chunks)
+    else:
+        with ProcessPoolExecutor(processes) as pool:
+            window = 2 * (processes or os.cpu_count() or 1)
+            summary = merge_summaries(_map_bounded(pool, _summarize_args,
+                                                   ((c, param3, param4, param5) for c in chunks), window))
+    return {
+        'result': summary.result,
+        'summary': f"Processed {summary.count} items",
+        'total': summary.total,
+        'intermediate_result': summary.positive_sum * len(cleaned),
+    }
+
+
+def benchmark_mega(size: int = 2_000_000) -> None:
+    """Compare mega_function with the chunked engine, serially and across processes."""
+    from code_quality_issue import mega_function
+
+    rng = random.Random(5)
+    values = [rng.uniform(-10, 10) for _ in range(size)]
+    args = ("  Label ", values, 3.0, 12.0, 0.5)
+
+    start = time.perf_counter()
+    expected = mega_function(*args)
+    print(f"mega_function: {time.perf_counter() - start:.3f}s")
+    for processes in (1, 2):
+        start = time.perf_counter()
+        output = run(*args, processes=processes)
+        print(f"run (processes={processes}): {time.perf_counter() - start:.3f}s")
+        assert output['result'] == expected['result']
+        assert output['summary'] == expected['summary']
+        assert math.isclose(output['total'], expected['total'], rel_tol=1e-9)
+
+
+if __name__ == "__main__":
+    benchmark_mega()
@@ -0,0 +1,177 @@
+# order_pipeline.py
+# Columnar batch order processing (replacement for code_quality_issue.process_order)
+
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Mapping, NamedTuple, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; stages fall back to pure Python
+    np = None
+
+# Surcharge per item, indexed by warranty + 2 * extended_warranty.
+# An extended warranty only applies on top of a standard one, as in process_order.
+WARRANTY_SURCHARGES: Dict[str, Sequence[float]] = {
+    'electronics': (0.0, 50.0, 0.0, 150.0),
+}
+
+
+class OrderColumns(NamedTuple):
+    order_index: Sequence[int]
+    price: Sequence[float]
+    quantity: Sequence[float]
+    available: Sequence[bool]
+    category: Sequence[int]
+    warranty_slot: Sequence[int]
+    order_count: int
+
+
+class OrderBatchResult(NamedTuple):
+    totals: List[float]
+    eligible_items: int
+    stage_seconds: Dict[str, float]
+    elapsed: float
+
+    @property
+    def orders_per_sec(self) -> float:
+        return len(self.totals) / self.elapsed if self.elapsed else float('inf')
+
+
+class SurchargeTable:
+    """Category names compiled to codes indexing rows of per-slot surcharges."""
+
+    def __init__(self, surcharges: Mapping[str, Sequence[float]] = None):
+        surcharges = WARRANTY_SURCHARGES if surcharges is None else surcharges
+        self.codes = {category: code for code, category in enumerate(surcharges)}
+        # The final row is for categories without surcharges
+        self.rows = [tuple(map(float, row)) for row in surcharges.values()] + [(0.0, 0.0, 0.0, 0.0)]
+        self.other = len(self.rows) - 1
+        self._flat = np.array(self.rows).ravel() if np is not None else None
+
+    def lookup(self, category: Sequence[int], slot: Sequence[int]):
+        if np is not None:
+            return self._flat[np.asarray(category) * 4 + np.asarray(slot)]
+        rows = self.rows
+        return [rows[c][s] for c, s in zip(category, slot)]
+
+
+def columnarize(orders: Sequence[Sequence[Mapping]], table: SurchargeTable) -> OrderColumns:
+    """Flatten a batch of orders (each a list of item dicts) into item columns; items are not modified.
+
+    As in process_order, only available items need a price and quantity;
+    unavailable ones get 0 for both.
+    """
+    order_index, price, quantity, available, category, slot = [], [], [], [], [], []
+    codes, other = table.codes, table.other
+    for index, items in enumerate(orders):
+        for item in items:
+            order_index.append(index)
+            if item['available']:
+                price.append(item['price'])
+                quantity.append(item['quantity'])
+                available.append(True)
+            else:
+                price.append(0.0)
+                quantity.append(0.0)
+                available.append(False)
+            category.append(codes.get(item.get('category'), other))
+            warranty = bool(item.get('warranty'))
+            slot.append(warranty + 2 * (warranty and bool(item.get('extended_warranty'))))
+    if np is not None:
+        return OrderColumns(np.array(order_index, dtype=np.intp), np.array(price, dtype=float),
+                            np.array(quantity, dtype=float), np.array(available, dtype=bool),
+                            np.array(category, dtype=np.intp), np.array(slot, dtype=np.intp), len(orders))
+    return OrderColumns(order_index, price, quantity, available, category, slot, len(orders))
+
+
+def eligibility_mask(columns: OrderColumns):
+    """Items that are available with a positive price and quantity."""
+    if np is not None:
+        return columns.available & (columns.price > 0) & (columns.quantity > 0)
+    return [a and p > 0 and q > 0 for a, p, q in zip(columns.available, columns.price, columns.quantity)]
+
+
+def order_totals(columns: OrderColumns, mask, surcharge) -> List[float]:
+    """Sum (price + surcharge) * quantity of eligible items per order."""
+    if np is not None:
+        lines = np.where(mask, (columns.price + surcharge) * columns.quantity, 0.0)
+        return np.bincount(columns.order_index, weights=lines, minlength=columns.order_count).tolist()
+    totals = [0.0] * columns.order_count
+    for index, ok, p, s, q in zip(columns.order_index, mask, columns.price, surcharge, columns.quantity):
+        if ok:
+            totals[index] += (p + s) * q
+    return totals
+
+
+def _process_chunk(orders: Sequence[Sequence[Mapping]], surcharges: Mapping = None):
+    timings = {}
+    start = time.perf_counter()
+    table = SurchargeTable(surcharges)
+    columns = columnarize(orders, table)
+    timings['columnarize'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    mask = eligibility_mask(columns)
+    timings['eligibility'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    surcharge = table.lookup(columns.category, columns.warranty_slot)
+    timings['surcharge'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    totals = order_totals(columns, mask, surcharge)
+    timings['aggregate'] = time.perf_counter() - start
+    eligible = int(mask.sum()) if np is not None else sum(mask)
+    return totals, eligible, timings
+
+
+def process_orders(orders: Sequence[Sequence[Mapping]], processes: Optional[int] = None,
+                   chunk_size: int = 10000, surcharges: Mapping = None) -> OrderBatchResult:
+    """Total a batch of independent orders, optionally split across worker processes.
+
+    Stage timings are summed across chunks, so with several processes they
+    measure CPU time spent per stage rather than wall time.
+    """
+    start = time.perf_counter()
+    chunks = [orders[i:i + chunk_size] for i in range(0, len(orders), chunk_size)]
+    if processes == 1 or len(chunks) <= 1:
+        results = [_process_chunk(chunk, surcharges) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(processes) as pool:
+            results = list(pool.map(_process_chunk, chunks, [surcharges] * len(chunks)))
+
+    totals: List[float] = []
+    eligible = 0
+    stage_seconds: Dict[str, float] = {}
+    for chunk_totals, chunk_eligible, timings in results:
+        totals.extend(chunk_totals)
+        eligible += chunk_eligible
+        for stage, seconds in timings.items():
+            stage_seconds[stage] = stage_seconds.get(stage, 0.0) + seconds
+    return OrderBatchResult(totals, eligible, stage_seconds, time.perf_counter() - start)
+
+
+def benchmark_orders(order_count: int = 200000, items_per_order: int = 5) -> None:
+    """Process a synthetic order batch serially and across processes."""
+    rng = random.Random(3)
+    categories = ['electronics', 'books', 'toys']
+    orders = [[{
+        'price': rng.choice([0, rng.uniform(1, 300)]) if rng.random() < 0.05 else rng.uniform(1, 300),
+        'quantity': rng.randint(0, 4),
+        'available': rng.random() > 0.1,
+        'category': rng.choice(categories),
+        'warranty': rng.random() < 0.3,
+        'extended_warranty': rng.random() < 0.3,
+    } for _ in range(items_per_order)] for _ in range(order_count)]
+
+    for processes in (1, None):
+        result = process_orders(orders, processes=processes)
+        label = "serial" if processes == 1 else "parallel"
+        stages = ", ".join(f"{stage} {seconds:.3f}s" for stage, seconds in result.stage_seconds.items())
+        print(f"{label:>8}: {result.orders_per_sec:12,.0f} orders/sec ({stages})")
+
+
+if __name__ == "__main__":
+    benchmark_orders()
@@ -0,0 +1,233 @@
+# password_denylist.py
+# Compact on-disk breached-password index with casefolded lookups
+# (replacement for BuggyStringProcessor.validate_password)
+
+import hashlib
+import heapq
+import mmap
+import os
+import random
+import struct
+import tempfile
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from typing import Iterable, Iterator, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; batch checks fall back to bisect
+    np = None
+
+_HEADER = struct.Struct('<8sQ')    # magic, entry count; keys follow as native-order uint64
+_MAGIC = b'PWDENY01'
+_ENTRY = 8
+_RUN_ENTRIES = 4_000_000            # keys sorted in memory per external-sort run
+
+# The list BuggyStringProcessor.validate_password checks against
+BUILTIN_DENYLIST = ('password', 'admin', '123456')
+
+
+def password_key(password: str) -> int:
+    """First 64 bits of SHA-1 over the casefolded, UTF-8 encoded password."""
+    digest = hashlib.sha1(password.casefold().encode('utf-8', 'surrogatepass')).digest()
+    return int.from_bytes(digest[:_ENTRY], 'big')
+
+
+def _read_run(path: str) -> Iterator[int]:
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(_ENTRY * 65536)
+            if not block:
+                return
+            yield from array('Q', block)
+
+
+def _sorted_keys(keys: array) -> array:
+    if np is not None:
+        return array('Q', np.sort(np.frombuffer(keys, dtype=np.uint64)).tobytes())
+    return array('Q', sorted(keys))
+
+
+def build_index(passwords: Iterable[str], index_path: str, run_entries: int = _RUN_ENTRIES) -> int:
+    """Write the sorted, de-duplicated key file for ``passwords``; returns the entry count.
+
+    Keys are sorted in runs of ``run_entries`` and merged, so memory stays
+    bounded for corpora far larger than RAM. The file is replaced atomically.
+    """
+    directory = os.path.dirname(os.path.abspath(index_path))
+    runs: List[str] = []
+    tmp_path = None
+    count = 0
+    try:
+        keys = array('Q')
+        for password in passwords:
+            keys.append(password_key(password))
+            if len(keys) >= run_entries:
+                runs.append(_write_run(_sorted_keys(keys), directory))
+                keys = array('Q')
+        if keys or not runs:
+            runs.append(_write_run(_sorted_keys(keys), directory))
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.denylist-', suffix='.tmp')
+        with os.fdopen(fd, 'wb') as out:
+            out.write(_HEADER.pack(_MAGIC, 0))
+            block = array('Q')
+            previous = None
+            for key in heapq.merge(*(_read_run(run) for run in runs)):
+                if key != previous:
+                    block.append(key)
+                    previous = key
+                    if len(block) >= 65536:
+                        count += len(block)
+                        block.tofile(out)
+                        block = array('Q')
+            count += len(block)
+            block.tofile(out)
+            out.seek(0)
+            out.write(_HEADER.pack(_MAGIC, count))
+        os.replace(tmp_path, index_path)
+    finally:
+        for run in runs:
+            os.unlink(run)
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+    return count
+
+
+def _write_run(keys: array, directory: str) -> str:
+    fd, path = tempfile.mkstemp(dir=directory, prefix='.denylist-run-')
+    with os.fdopen(fd, 'wb') as f:
+        keys.tofile(f)
+    return path
+
+
+def iter_password_file(path: str) -> Iterator[str]:
+    """One password per line; bytes that are not valid UTF-8 are replaced, not fatal."""
+    with open(path, 'r', encoding='utf-8', errors='replace', newline=None) as f:
+        for line in f:
+            line = line.rstrip('\r\n')
+            if line:
+                yield line
+
+
+def build_index_from_file(source_path: str, index_path: str, run_entries: int = _RUN_ENTRIES) -> int:
+    return build_index(iter_password_file(source_path), index_path, run_entries)
+
+
+class PasswordDenylist:
+    """Case-insensitive membership test against a sorted key file, mapped on first use.
+
+    Lookups are a binary search over the mapped keys (O(log n), no parsing);
+    with 64-bit keys the false-positive probability is about n / 2**64.
+    """
+
+    def __init__(self, index_path: Optional[str] = None, extra: Iterable[str] = BUILTIN_DENYLIST):
+        self.index_path = index_path
+        self._extra = frozenset(password_key(p) for p in extra)
+        self._keys = None
+        self._mmap = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        keys = self._keys
+        if keys is not None:
+            return keys
+        with self._lock:
+            if self._keys is None:
+                if self.index_path is None:
+                    self._keys = memoryview(array('Q'))
+                else:
+                    self._keys = self._map(self.index_path)
+        return self._keys
+
+    def _map(self, path: str) -> memoryview:
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _HEADER.size:
+                raise ValueError(f"{path} is not a password denylist index")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count = _HEADER.unpack_from(self._mmap, 0)
+        if magic != _MAGIC or size != _HEADER.size + count * _ENTRY:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a password denylist index")
+        return memoryview(self._mmap)[_HEADER.size:].cast('Q')
+
+    def __len__(self):
+        return len(self._load())
+
+    def _contains_key(self, key: int, keys) -> bool:
+        if key in self._extra:
+            return True
+        position = bisect_left(keys, key)
+        return position < len(keys) and keys[position] == key
+
+    def is_denied(self, password: str) -> bool:
+        return self._contains_key(password_key(password), self._load())
+
+    __contains__ = is_denied
+
+    def validate_password(self, password: str) -> bool:
+        """True when the password is not on the denylist, regardless of letter case."""
+        return not self.is_denied(password)
+
+    def check_many(self, passwords: Iterable[str]) -> List[bool]:
+        """Denied flags for a batch of passwords, in input order."""
+        keys = self._load()
+        query = [password_key(p) for p in passwords]
+        if np is not None and len(keys):
+            table = np.frombuffer(keys, dtype=np.uint64)
+            wanted = np.array(query, dtype=np.uint64)
+            positions = np.minimum(np.searchsorted(table, wanted), len(table) - 1)
+            found = (table[positions] == wanted).tolist()
+            extra = self._extra
+            return [hit or key in extra for hit, key in zip(found, query)]
+        contains = self._contains_key
+        return [contains(key, keys) for key in query]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._keys is not None:
+                self._keys.release()
+                self._keys = None
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def benchmark_denylist(entries: int = 2_000_000, queries: int = 200_000) -> None:
+    """Build time, index size and lookup rates for a synthetic corpus."""
+    rng = random.Random(6)
+    corpus = [f"pw{rng.getrandbits(40):x}" for _ in range(entries)]
+    probes = [rng.choice(corpus).upper() if i % 2 else f"fresh{i}" for i in range(queries)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'denylist.idx')
+        start = time.perf_counter()
+        count = build_index(corpus, path, run_entries=500_000)
+        print(f"build: {count:,} keys in {time.perf_counter() - start:.2f}s, "
+              f"{os.path.getsize(path) / 2 ** 20:.1f} MiB on disk")
+
+        with PasswordDenylist(path) as denylist:
+            start = time.perf_counter()
+            denylist.is_denied('warm-up')
+            print(f"first lookup (maps the file): {(time.perf_counter() - start) * 1e6:.0f} us")
+
+            start = time.perf_counter()
+            hits = sum(denylist.is_denied(p) for p in probes)
+            print(f"is_denied : {queries / (time.perf_counter() - start):12,.0f} lookups/sec ({hits} denied)")
+
+            start = time.perf_counter()
+            flags = denylist.check_many(probes)
+            print(f"check_many: {queries / (time.perf_counter() - start):12,.0f} lookups/sec ({sum(flags)} denied)")
+
+
+if __name__ == "__main__":
+    benchmark_denylist()
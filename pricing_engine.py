@@ -0,0 +1,182 @@
+# pricing_engine.py
+# Table-driven batch pricing (replacement for calculate_pricing / BuggyCalculator.calculate_discount)
+
+import csv
+import math
+import random
+import time
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; pricing falls back to pure Python
+    np = None
+
+# Rules equivalent to code_quality_issue.calculate_pricing
+CATALOG_PRICING_RULES = [
+    {'rule': 'discount', 'key': 'premium', 'value': 0.15},
+    {'rule': 'discount', 'key': 'gold', 'value': 0.25},
+    {'rule': 'discount', 'key': 'silver', 'value': 0.10},
+    {'rule': 'discount', 'key': '*', 'value': 0.0},
+    {'rule': 'tax', 'value': 0.08},
+    {'rule': 'shipping', 'value': 15.99, 'threshold': 50},
+]
+
+# Rules equivalent to buggy_code.BuggyCalculator.calculate_discount (unknown types are rejected)
+CALCULATOR_DISCOUNT_RULES = [
+    {'rule': 'discount', 'key': 'premium', 'value': 0.2},
+    {'rule': 'discount', 'key': 'regular', 'value': 0.1},
+    {'rule': 'discount', 'key': 'vip', 'value': 0.3},
+]
+
+
+class PricingError(ValueError):
+    """Raised for malformed rule tables or customer types with no discount rule."""
+
+
+class PricingTable:
+    """Compiled pricing rules: customer types map to codes indexing a discount array.
+
+    A ``'*'`` discount row sets the rate for unknown customer types; without it
+    unknown types raise PricingError. Shipping is charged when the base price is
+    below the shipping threshold.
+    """
+
+    def __init__(self, discounts: Mapping[str, float], tax_rate: float = 0.0,
+                 shipping_fee: float = 0.0, shipping_threshold: float = 0.0,
+                 default_discount: Optional[float] = None):
+        self.codes: Dict[str, int] = {}
+        rates = []
+        for customer_type, rate in discounts.items():
+            self.codes[customer_type] = len(rates)
+            rates.append(float(rate))
+        # Last slot is for unknown customer types; NaN marks "reject"
+        rates.append(math.nan if default_discount is None else float(default_discount))
+        self.unknown_code = len(rates) - 1
+        self.rates = rates
+        self.tax_rate = float(tax_rate)
+        self.shipping_fee = float(shipping_fee)
+        self.shipping_threshold = float(shipping_threshold)
+        self._rates_array = np.array(rates) if np is not None else None
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Mapping]) -> "PricingTable":
+        """Build from rule rows with ``rule`` (discount/tax/shipping), ``key``, ``value`` and ``threshold``."""
+        discounts = {}
+        default_discount = None
+        options = {}
+        for row in rows:
+            rule = str(row.get('rule', '')).strip().lower()
+            try:
+                value = float(row['value'])
+            except (KeyError, TypeError, ValueError):
+                raise PricingError(f"Rule row has no numeric value: {dict(row)!r}") from None
+            if rule == 'discount':
+                key = str(row.get('key', '')).strip()
+                if not key:
+                    raise PricingError(f"Discount rule without a customer type: {dict(row)!r}")
+                if key == '*':
+                    default_discount = value
+                else:
+                    discounts[key] = value
+            elif rule == 'tax':
+                options['tax_rate'] = value
+            elif rule == 'shipping':
+                options['shipping_fee'] = value
+                options['shipping_threshold'] = float(row.get('threshold') or 0)
+            else:
+                raise PricingError(f"Unknown rule type: {rule!r}")
+        return cls(discounts, default_discount=default_discount, **options)
+
+    @classmethod
+    def from_csv(cls, path: str) -> "PricingTable":
+        """Load rules from a CSV file with columns rule,key,value,threshold."""
+        with open(path, 'r', newline='', encoding='utf-8') as f:
+            return cls.from_rows(csv.DictReader(f))
+
+    def _code_of(self, customer_type: str) -> int:
+        code = self.codes.get(customer_type, self.unknown_code)
+        if code == self.unknown_code and math.isnan(self.rates[code]):
+            raise PricingError(f"No discount rule for customer type {customer_type!r}")
+        return code
+
+    def price(self, base_price: float, customer_type: str) -> float:
+        """Price a single item."""
+        discount = base_price * self.rates[self._code_of(customer_type)]
+        net = base_price - discount
+        shipping = self.shipping_fee if base_price < self.shipping_threshold else 0.0
+        return base_price - discount + net * self.tax_rate + shipping
+
+    def price_batch(self, prices: Sequence[float], customer_types: Sequence[str]):
+        """Price whole columns at once; returns an ndarray with NumPy, else a list."""
+        if len(prices) != len(customer_types):
+            raise PricingError("prices and customer_types must have the same length")
+        if np is None:
+            rate_of = {t: self.rates[self._code_of(t)] for t in set(customer_types)}
+            tax, fee, threshold = self.tax_rate, self.shipping_fee, self.shipping_threshold
+            return [p - d + (p - d) * tax + (fee if p < threshold else 0.0)
+                    for p, d in zip(prices, [p * rate_of[t] for p, t in zip(prices, customer_types)])]
+        prices = np.asarray(prices, dtype=float)
+        unique_types, inverse = np.unique(np.asarray(customer_types, dtype=object).astype(str), return_inverse=True)
+        codes = np.array([self._code_of(t) for t in unique_types], dtype=np.intp)
+        discount = prices * self._rates_array[codes[inverse]]
+        net = prices - discount
+        shipping = np.where(prices < self.shipping_threshold, self.shipping_fee, 0.0)
+        return prices - discount + net * self.tax_rate + shipping
+
+
+def check_equivalence(samples: int = 10000) -> List[str]:
+    """Compare the engine with the reference implementations; returns mismatch descriptions."""
+    from buggy_code import BuggyCalculator
+    from code_quality_issue import calculate_pricing
+
+    rng = random.Random(42)
+    mismatches = []
+
+    catalog = PricingTable.from_rows(CATALOG_PRICING_RULES)
+    types = ['premium', 'gold', 'silver', 'basic', '']
+    prices = [round(rng.uniform(0, 200), 2) for _ in range(samples)]
+    customers = [rng.choice(types) for _ in range(samples)]
+    for p, t, got in zip(prices, customers, catalog.price_batch(prices, customers)):
+        expected = calculate_pricing(p, t)
+        if not math.isclose(got, expected, rel_tol=1e-12, abs_tol=1e-9):
+            mismatches.append(f"calculate_pricing({p}, {t!r}): {got} != {expected}")
+
+    calculator = BuggyCalculator()
+    discount_table = PricingTable.from_rows(CALCULATOR_DISCOUNT_RULES)
+    known = ['premium', 'regular', 'vip']
+    customers = [rng.choice(known) for _ in range(samples)]
+    for p, t, got in zip(prices, customers, discount_table.price_batch(prices, customers)):
+        expected = calculator.calculate_discount(p, t)
+        if not math.isclose(got, expected, rel_tol=1e-12, abs_tol=1e-9):
+            mismatches.append(f"calculate_discount({p}, {t!r}): {got} != {expected}")
+    return mismatches
+
+
+def benchmark_catalog(size: int = 1_000_000) -> None:
+    """Reprice a synthetic catalog with the reference function and the batch engine."""
+    from code_quality_issue import calculate_pricing
+
+    rng = random.Random(7)
+    prices = [rng.uniform(1, 500) for _ in range(size)]
+    customers = [rng.choice(['premium', 'gold', 'silver', 'basic']) for _ in range(size)]
+
+    start = time.perf_counter()
+    for p, t in zip(prices, customers):
+        calculate_pricing(p, t)
+    reference = time.perf_counter() - start
+
+    table = PricingTable.from_rows(CATALOG_PRICING_RULES)
+    start = time.perf_counter()
+    table.price_batch(prices, customers)
+    batch = time.perf_counter() - start
+
+    engine = "NumPy" if np is not None else "pure Python"
+    print(f"calculate_pricing loop: {size / reference:14,.0f} prices/sec")
+    print(f"price_batch ({engine}): {size / batch:14,.0f} prices/sec")
+
+
+if __name__ == "__main__":
+    problems = check_equivalence()
+    print("Equivalence:", "OK" if not problems else problems[:5])
+    benchmark_catalog()
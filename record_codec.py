@@ -0,0 +1,236 @@
+# record_codec.py
+# Schema'd struct-packed binary records: a safe replacement for pickle.loads on user payloads
+
+import io
+import json
+import pickle
+import struct
+import time
+import zlib
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Mapping, Sequence, Tuple, Union
+
+_FIXED_TYPES = {'i32': 'i', 'i64': 'q', 'u32': 'I', 'f64': 'd', 'bool': '?'}
+_VARIABLE_TYPES = ('str', 'bytes')
+
+_LENGTH = struct.Struct('<I')
+_SLOT = struct.Struct('<II')  # (offset, length) of a variable-size field
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+class CodecError(ValueError):
+    """Raised for payloads that do not match the schema or are malformed."""
+
+
+def _blob(name: str, kind: str, value) -> bytes:
+    # bytes() would also accept an int (a zero-filled buffer that size) or an iterable of ints
+    if kind == 'str' and isinstance(value, str):
+        try:
+            return value.encode('utf-8')
+        except UnicodeEncodeError as e:
+            raise CodecError(f"Field {name!r}: {e}") from None
+    if kind == 'bytes' and isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value)
+    raise CodecError(f"Field {name!r} expects {kind}, got {type(value).__name__}")
+
+
+class Schema:
+    """Ordered field layout: fixed-size fields in a packed header, variable fields after it."""
+
+    def __init__(self, fields: Sequence[Tuple[str, str]]):
+        self.fields = tuple(fields)
+        for name, kind in self.fields:
+            if kind not in _FIXED_TYPES and kind not in _VARIABLE_TYPES:
+                raise ValueError(f"Unknown field type {kind!r} for {name!r}")
+        self.fixed = tuple(name for name, kind in self.fields if kind in _FIXED_TYPES)
+        self.variable = tuple((name, kind) for name, kind in self.fields if kind in _VARIABLE_TYPES)
+        self.fingerprint = zlib.crc32(repr(self.fields).encode('utf-8'))
+        fmt = '<I' + ''.join(_FIXED_TYPES[kind] for _, kind in self.fields if kind in _FIXED_TYPES)
+        fmt += 'II' * len(self.variable)
+        self.header = struct.Struct(fmt)
+
+        # Byte offset of every field inside the header, for single-field unpacking
+        self._locations: Dict[str, Tuple[struct.Struct, int, str]] = {}
+        offset = 4
+        for name, kind in self.fields:
+            if kind in _FIXED_TYPES:
+                field = struct.Struct('<' + _FIXED_TYPES[kind])
+                self._locations[name] = (field, offset, kind)
+                offset += field.size
+        for name, kind in self.variable:
+            self._locations[name] = (_SLOT, offset, kind)
+            offset += _SLOT.size
+
+    def __repr__(self):
+        return f"Schema({list(self.fields)!r})"
+
+    def encode(self, record: Mapping) -> bytes:
+        """Pack one record; every schema field must be present."""
+        try:
+            values = [record[name] for name in self.fixed]
+            blobs = [_blob(name, kind, record[name]) for name, kind in self.variable]
+        except KeyError as e:
+            raise CodecError(f"Missing field {e.args[0]!r}") from None
+        offset = self.header.size
+        for blob in blobs:
+            values += (offset, len(blob))
+            offset += len(blob)
+        try:
+            header = self.header.pack(self.fingerprint, *values)
+        except struct.error as e:
+            raise CodecError(str(e)) from None
+        return header + b''.join(blobs)
+
+    def decode(self, data: Buffer) -> "LazyRecord":
+        """Wrap a payload without copying; fields are unpacked on access."""
+        view = memoryview(data).cast('B')
+        if len(view) < self.header.size:
+            raise CodecError("Payload shorter than record header")
+        if _LENGTH.unpack_from(view, 0)[0] != self.fingerprint:
+            raise CodecError("Payload was not encoded with this schema")
+        for name, _ in self.variable:
+            _, position, _ = self._locations[name]
+            start, length = _SLOT.unpack_from(view, position)
+            if start < self.header.size or start + length > len(view):
+                raise CodecError(f"Field {name!r} points outside the payload")
+        return LazyRecord(self, view)
+
+    def encode_stream(self, records: Iterable[Mapping], stream: BinaryIO) -> int:
+        """Write length-prefixed records to ``stream``; returns the number written."""
+        count = 0
+        for record in records:
+            payload = self.encode(record)
+            stream.write(_LENGTH.pack(len(payload)))
+            stream.write(payload)
+            count += 1
+        return count
+
+    def iter_decode(self, source: Union[Buffer, BinaryIO]) -> Iterator["LazyRecord"]:
+        """Yield records from a buffer (zero-copy slices) or a readable stream."""
+        if hasattr(source, 'read'):
+            while True:
+                prefix = source.read(_LENGTH.size)
+                if not prefix:
+                    return
+                if len(prefix) < _LENGTH.size:
+                    raise CodecError("Truncated length prefix")
+                size = _LENGTH.unpack(prefix)[0]
+                payload = source.read(size)
+                if len(payload) < size:
+                    raise CodecError("Truncated record")
+                yield self.decode(payload)
+        view = memoryview(source).cast('B')
+        position = 0
+        while position < len(view):
+            if position + _LENGTH.size > len(view):
+                raise CodecError("Truncated length prefix")
+            size = _LENGTH.unpack_from(view, position)[0]
+            position += _LENGTH.size
+            if position + size > len(view):
+                raise CodecError("Truncated record")
+            yield self.decode(view[position:position + size])
+            position += size
+
+
+class LazyRecord:
+    """Read-only view of one encoded record; ``bytes`` fields come back as memoryviews."""
+
+    __slots__ = ('_schema', '_view')
+
+    def __init__(self, schema: Schema, view: memoryview):
+        self._schema = schema
+        self._view = view
+
+    def __getitem__(self, name: str):
+        try:
+            field, position, kind = self._schema._locations[name]
+        except KeyError:
+            raise KeyError(name) from None
+        if kind in _FIXED_TYPES:
+            return field.unpack_from(self._view, position)[0]
+        start, length = field.unpack_from(self._view, position)
+        value = self._view[start:start + length]
+        if kind != 'str':
+            return value
+        try:
+            return str(value, 'utf-8')
+        except UnicodeDecodeError as e:
+            raise CodecError(f"Field {name!r} is not valid UTF-8: {e.reason}") from None
+
+    def __getattr__(self, name: str):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __repr__(self):
+        return f"LazyRecord({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict:
+        """Materialize every field (``bytes`` fields are copied)."""
+        result = {}
+        for name, kind in self._schema.fields:
+            value = self[name]
+            result[name] = bytes(value) if kind == 'bytes' else value
+        return result
+
+
+USER_SCHEMA = Schema([
+    ('id', 'i64'),
+    ('is_admin', 'bool'),
+    ('created', 'f64'),
+    ('username', 'str'),
+    ('email', 'str'),
+    ('avatar', 'bytes'),
+])
+
+
+def load_user_data(serialized_data: Buffer) -> LazyRecord:
+    """Safe counterpart of VulnerableWebApp.load_user_data."""
+    return USER_SCHEMA.decode(serialized_data)
+
+
+def benchmark_codecs(count: int = 100000) -> List[Tuple[str, float, float, int]]:
+    """Encode/decode time and payload size for this codec versus pickle and json."""
+    records = [
+        {'id': i, 'is_admin': i % 97 == 0, 'created': 1.7e9 + i, 'username': f"user{i}",
+         'email': f"user{i}@example.com", 'avatar': bytes(64)}
+        for i in range(count)
+    ]
+    json_records = [dict(record, avatar=record['avatar'].hex()) for record in records]
+    results = []
+
+    def measure(label, encode, decode):
+        start = time.perf_counter()
+        payload = encode()
+        encoded = time.perf_counter() - start
+        start = time.perf_counter()
+        decode(payload)
+        decoded = time.perf_counter() - start
+        results.append((label, encoded, decoded, len(payload)))
+
+    def encode_struct():
+        buffer = io.BytesIO()
+        USER_SCHEMA.encode_stream(records, buffer)
+        return buffer.getvalue()
+
+    measure('struct (lazy, read id)', encode_struct,
+            lambda payload: [record['id'] for record in USER_SCHEMA.iter_decode(payload)])
+    measure('struct (full decode)', encode_struct,
+            lambda payload: [record.to_dict() for record in USER_SCHEMA.iter_decode(payload)])
+    measure('pickle', lambda: pickle.dumps(records, protocol=pickle.HIGHEST_PROTOCOL), pickle.loads)
+    measure('json', lambda: json.dumps(json_records).encode('utf-8'), json.loads)
+    try:
+        import msgpack
+    except ImportError:
+        pass
+    else:
+        measure('msgpack', lambda: msgpack.packb(records), msgpack.unpackb)
+
+    for label, encoded, decoded, size in results:
+        print(f"{label:>24}: encode {encoded:.3f}s  decode {decoded:.3f}s  {size / count:7.1f} bytes/record")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark_codecs()
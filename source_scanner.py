@@ -0,0 +1,386 @@
+# source_scanner.py
+# Single-pass AST scanner for the vulnerability patterns catalogued in this repo
+
+import ast
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import ExitStack
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+# Third-party module names that are the same library under another import name
+_MODULE_SYNONYMS = {'pyyaml': 'yaml', 'cPickle': 'pickle', '_pickle': 'pickle'}
+
+_SKIP_DIRS = {'__pycache__', '.git', '.hg', '.svn', '.tox', '.nox', '.venv', 'venv', 'node_modules'}
+
+# Below this many cache misses the pool start-up costs more than it saves
+_PARALLEL_THRESHOLD = 32
+_BATCH_BYTES = 16 << 20     # source of cache misses held in memory before it is analyzed
+
+
+class Finding(NamedTuple):
+    path: str
+    line: int
+    col: int
+    rule_id: str
+    message: str
+
+
+class ScanResult(NamedTuple):
+    findings: List[Finding]
+    files_scanned: int
+    cache_hits: int
+    elapsed: float
+
+    @property
+    def files_per_sec(self) -> float:
+        return self.files_scanned / self.elapsed if self.elapsed else float('inf')
+
+
+class Rule(NamedTuple):
+    rule_id: str
+    node_type: type
+    message: str
+    check: Callable
+
+
+class _Context:
+    """Per-file state shared by rules during the walk (import aliases and imported modules so far)."""
+
+    def __init__(self):
+        self.aliases: Dict[str, str] = {}
+        self.imports: Set[str] = set()
+
+    def qualified_name(self, node: ast.AST) -> Optional[str]:
+        parts = []
+        while isinstance(node, ast.Attribute):
+            parts.append(node.attr)
+            node = node.value
+        if not isinstance(node, ast.Name):
+            return None
+        parts.append(self.aliases.get(node.id, _MODULE_SYNONYMS.get(node.id, node.id)))
+        return '.'.join(reversed(parts))
+
+
+def _keyword(call: ast.Call, name: str):
+    for keyword in call.keywords:
+        if keyword.arg == name:
+            return keyword.value
+    return None
+
+
+def _keyword_is(call: ast.Call, name: str, value) -> bool:
+    node = _keyword(call, name)
+    return isinstance(node, ast.Constant) and type(node.value) is type(value) and node.value == value
+
+
+def _calls(*names: str) -> Callable:
+    targets = set(names)
+    return lambda node, ctx: ctx.qualified_name(node.func) in targets
+
+
+def _yaml_load_without_loader(node: ast.Call, ctx: _Context) -> bool:
+    if ctx.qualified_name(node.func) not in ('yaml.load', 'yaml.load_all'):
+        return False
+    return len(node.args) < 2 and _keyword(node, 'Loader') is None
+
+
+def _request_without_timeout(node: ast.Call, ctx: _Context) -> bool:
+    name = ctx.qualified_name(node.func)
+    if name is None or not name.startswith('requests.'):
+        return False
+    verb = name[len('requests.'):]
+    return verb in ('get', 'post', 'put', 'patch', 'delete', 'head', 'request') and _keyword(node, 'timeout') is None
+
+
+def _track_import(node: ast.AST, ctx: _Context) -> None:
+    """Record import aliases so later calls resolve to qualified names."""
+    if isinstance(node, ast.Import):
+        for alias in node.names:
+            ctx.imports.add(alias.name)
+            module = _MODULE_SYNONYMS.get(alias.name, alias.name)
+            if alias.asname:
+                ctx.aliases[alias.asname] = module
+            else:
+                head = alias.name.split('.')[0]
+                ctx.aliases[head] = _MODULE_SYNONYMS.get(head, head)
+    elif node.level:
+        # Relative imports are recorded with their leading dots for the caller to resolve
+        prefix = '.' * node.level + (node.module or '')
+        ctx.imports.update(f"{prefix}.{alias.name}" if node.module else prefix + alias.name
+                           for alias in node.names if alias.name != '*')
+        ctx.imports.add(prefix)
+    elif node.module:
+        ctx.imports.add(node.module)
+        ctx.imports.update(f"{node.module}.{alias.name}" for alias in node.names if alias.name != '*')
+        module = _MODULE_SYNONYMS.get(node.module, node.module)
+        for alias in node.names:
+            ctx.aliases[alias.asname or alias.name] = f"{module}.{alias.name}"
+
+
+def _imports_deprecated(node: ast.AST, ctx: _Context) -> bool:
+    deprecated = {'cgi', 'imp', 'pipes', 'telnetlib'}
+    if isinstance(node, ast.Import):
+        return any(alias.name.split('.')[0] in deprecated for alias in node.names)
+    return bool(node.module) and not node.level and node.module.split('.')[0] in deprecated
+
+
+RULES: List[Rule] = [
+    Rule('deprecated-import', ast.Import, "Import of a deprecated, insecure module", _imports_deprecated),
+    Rule('deprecated-import', ast.ImportFrom, "Import of a deprecated, insecure module", _imports_deprecated),
+    Rule('shell-true', ast.Call, "subprocess call with shell=True",
+         lambda node, ctx: _keyword_is(node, 'shell', True)),
+    Rule('pickle-load', ast.Call, "pickle deserialization of possibly untrusted data",
+         _calls('pickle.loads', 'pickle.load', 'dill.loads', 'dill.load')),
+    Rule('yaml-load', ast.Call, "yaml.load without an explicit Loader", _yaml_load_without_loader),
+    Rule('eval-exec', ast.Call, "eval/exec of dynamic code", _calls('eval', 'exec')),
+    Rule('weak-hash', ast.Call, "MD5/SHA-1 used for hashing",
+         lambda node, ctx: ctx.qualified_name(node.func) in ('hashlib.md5', 'hashlib.sha1')
+         or (ctx.qualified_name(node.func) == 'hashlib.new' and bool(node.args)
+             and isinstance(node.args[0], ast.Constant) and str(node.args[0].value).lower() in ('md5', 'sha1'))),
+    Rule('verify-false', ast.Call, "TLS certificate verification disabled",
+         lambda node, ctx: _keyword_is(node, 'verify', False)),
+    Rule('cert-none', ast.Call, "TLS certificate requirements set to CERT_NONE",
+         lambda node, ctx: _keyword_is(node, 'cert_reqs', 'CERT_NONE')),
+    Rule('debug-true', ast.Call, "Application run with debug=True",
+         lambda node, ctx: isinstance(node.func, ast.Attribute) and node.func.attr == 'run'
+         and _keyword_is(node, 'debug', True)),
+    Rule('autoescape-false', ast.Call, "Template rendering with autoescape disabled",
+         lambda node, ctx: _keyword_is(node, 'autoescape', False)),
+    Rule('request-no-timeout', ast.Call, "HTTP request without a timeout", _request_without_timeout),
+    Rule('wildcard-import', ast.ImportFrom, "Wildcard import hides where names come from",
+         lambda node, ctx: any(alias.name == '*' for alias in node.names)),
+    Rule('bare-except', ast.ExceptHandler, "Bare except clause swallows every exception",
+         lambda node, ctx: node.type is None),
+]
+
+
+def _rules_by_type(rules: Iterable[Rule]) -> Dict[type, Tuple[Rule, ...]]:
+    table: Dict[type, list] = {}
+    for rule in rules:
+        table.setdefault(rule.node_type, []).append(rule)
+    return {node_type: tuple(entries) for node_type, entries in table.items()}
+
+
+_DISPATCH = _rules_by_type(RULES)
+
+
+def analyze_source(source, path: str = '<string>') -> Tuple[List[Finding], List[str]]:
+    """Parse once and run every rule in a single walk; returns (findings, imported modules)."""
+    try:
+        tree = ast.parse(source, filename=path)
+    except (SyntaxError, ValueError) as e:
+        return [Finding(path, getattr(e, 'lineno', 0) or 0, 0, 'syntax-error', str(e))], []
+    ctx = _Context()
+    findings = []
+    dispatch = _DISPATCH
+    for node in ast.walk(tree):
+        # Aliases are tracked per file, not per scope: an import anywhere in the file resolves
+        # matching names everywhere. Breadth-first order sees module-level imports before calls
+        # inside functions, but a call can be visited before a later or more deeply nested import
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            _track_import(node, ctx)
+        rules = dispatch.get(type(node))
+        if rules is None:
+            continue
+        for rule in rules:
+            if rule.check(node, ctx):
+                findings.append(Finding(path, node.lineno, node.col_offset, rule.rule_id, rule.message))
+    findings.sort(key=lambda f: (f.line, f.col, f.rule_id))
+    return findings, sorted(ctx.imports)
+
+
+def scan_source(source, path: str = '<string>') -> List[Finding]:
+    """Parse once and run every rule in a single walk over the tree."""
+    return analyze_source(source, path)[0]
+
+
+def scan_file(path: str) -> List[Finding]:
+    with open(path, 'rb') as f:
+        return scan_source(f.read(), path)
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def ruleset_digest() -> str:
+    """Hash of this module's source; any change to the rules invalidates persisted findings."""
+    with open(__file__, 'rb') as f:
+        return content_hash(f.read())
+
+
+class ScanCache:
+    """Findings keyed by file content hash, optionally persisted as JSON.
+
+    The file records the ruleset digest it was built with and is ignored
+    when that no longer matches the current rules.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.ruleset = ruleset_digest()
+        self._entries: Dict[str, List[Tuple[int, int, str, str]]] = {}
+        if path and os.path.exists(path):
+            # An unreadable or malformed file is treated as an empty cache and rewritten on save
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    payload = json.load(f)
+                if isinstance(payload, dict) and payload.get('ruleset') == self.ruleset:
+                    self._entries = {key: [tuple(item) for item in value]
+                                     for key, value in payload['entries'].items()}
+            except (ValueError, TypeError, KeyError, AttributeError):
+                self._entries = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, digest: str, path: str) -> Optional[List[Finding]]:
+        entry = self._entries.get(digest)
+        if entry is None:
+            return None
+        return [Finding(path, *item) for item in entry]
+
+    def put(self, digest: str, findings: List[Finding]) -> None:
+        self._entries[digest] = [(f.line, f.col, f.rule_id, f.message) for f in findings]
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'ruleset': self.ruleset, 'entries': self._entries}, f)
+        os.replace(tmp_path, self.path)
+
+
+def iter_python_files(root: str) -> Iterable[str]:
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in _SKIP_DIRS and not d.startswith('.'))
+        for filename in sorted(filenames):
+            if filename.endswith('.py'):
+                yield os.path.join(dirpath, filename)
+
+
+def _analyze_payload(payload: Tuple[str, bytes]) -> Tuple[List[Finding], List[str]]:
+    path, data = payload
+    return analyze_source(data, path)
+
+
+def analyze_payloads(payloads: List[Tuple[str, bytes]], processes: Optional[int] = None,
+                     pool: Optional[Executor] = None) -> List[Tuple[List[Finding], List[str]]]:
+    """Analyze (path, source) pairs, over a process pool when there are enough of them.
+
+    ``pool`` is used instead of starting a new one, for callers analyzing several batches.
+    """
+    if processes == 1 or len(payloads) < _PARALLEL_THRESHOLD:
+        return [_analyze_payload(payload) for payload in payloads]
+    chunksize = max(1, len(payloads) // 256)
+    if pool is not None:
+        return list(pool.map(_analyze_payload, payloads, chunksize=chunksize))
+    with ProcessPoolExecutor(processes) as pool:
+        return list(pool.map(_analyze_payload, payloads, chunksize=chunksize))
+
+
+def scan_paths(paths: Iterable[str], cache: Optional[ScanCache] = None,
+               processes: Optional[int] = None) -> ScanResult:
+    """Scan files, reusing cached findings for unchanged content and fanning misses over processes."""
+    start = time.perf_counter()
+    cache = cache if cache is not None else ScanCache()
+    findings: List[Finding] = []
+    misses: List[Tuple[str, bytes, str]] = []
+    pending = scanned = hits = 0
+    with ExitStack() as stack:
+        pool = None
+
+        # Misses are analyzed in batches of about _BATCH_BYTES so a large tree is never held in memory
+        def analyze_misses():
+            nonlocal pool
+            if pool is None and processes != 1 and len(misses) >= _PARALLEL_THRESHOLD:
+                pool = stack.enter_context(ProcessPoolExecutor(processes))
+            payloads = [(path, data) for path, data, _ in misses]
+            for (_, _, digest), (file_findings, _) in zip(misses, analyze_payloads(payloads, processes, pool)):
+                cache.put(digest, file_findings)
+                findings.extend(file_findings)
+            misses.clear()
+
+        for path in paths:
+            with open(path, 'rb') as f:
+                data = f.read()
+            digest = content_hash(data)
+            scanned += 1
+            cached = cache.get(digest, path)
+            if cached is not None:
+                hits += 1
+                findings.extend(cached)
+                continue
+            misses.append((path, data, digest))
+            pending += len(data)
+            if pending >= _BATCH_BYTES:
+                analyze_misses()
+                pending = 0
+        analyze_misses()
+    return ScanResult(findings, scanned, hits, time.perf_counter() - start)
+
+
+def scan_tree(root: str, cache: Optional[ScanCache] = None, processes: Optional[int] = None) -> ScanResult:
+    return scan_paths(iter_python_files(root), cache, processes)
+
+
+# ==================== GOLDEN CORPUS ====================
+
+# Expected rule hits for the example modules shipped in this repository
+GOLDEN_CORPUS: Dict[str, Dict[str, int]] = {
+    'security_vulnerabilities.py': {'shell-true': 1, 'pickle-load': 1, 'weak-hash': 1},
+    'oss_vulnerabilities.py': {
+        'deprecated-import': 3, 'yaml-load': 2, 'verify-false': 2, 'request-no-timeout': 2,
+        'debug-true': 1, 'pickle-load': 1, 'cert-none': 1, 'autoescape-false': 1,
+        'shell-true': 1, 'eval-exec': 2,
+    },
+    'buggy_code.py': {'bare-except': 1, 'request-no-timeout': 2},
+    'code_quality_issue.py': {'wildcard-import': 1, 'request-no-timeout': 1},
+}
+
+
+def check_golden_corpus(root: Optional[str] = None) -> Dict[str, Tuple[Dict[str, int], Dict[str, int]]]:
+    """Return {filename: (expected, actual)} for every corpus file whose rule counts differ."""
+    root = root or os.path.dirname(os.path.abspath(__file__))
+    mismatches = {}
+    for filename, expected in GOLDEN_CORPUS.items():
+        actual: Dict[str, int] = {}
+        for finding in scan_file(os.path.join(root, filename)):
+            actual[finding.rule_id] = actual.get(finding.rule_id, 0) + 1
+        if actual != expected:
+            mismatches[filename] = (expected, actual)
+    return mismatches
+
+
+def benchmark_tree(copies: int = 2000, processes: Optional[int] = None) -> None:
+    """Scan a synthetic tree built from the corpus files, cold and then warm."""
+    root = os.path.dirname(os.path.abspath(__file__))
+    sources = [os.path.join(root, name) for name in GOLDEN_CORPUS]
+    with tempfile.TemporaryDirectory() as workdir:
+        for i in range(copies):
+            subdir = os.path.join(workdir, f"pkg{i // 100}")
+            os.makedirs(subdir, exist_ok=True)
+            source = sources[i % len(sources)]
+            target = os.path.join(subdir, f"module_{i}.py")
+            shutil.copyfile(source, target)
+            # Make each file unique so the content cache cannot short-circuit the cold run
+            with open(target, 'a', encoding='utf-8') as f:
+                f.write(f"\n_VARIANT = {i}\n")
+
+        cache = ScanCache()
+        cold = scan_tree(workdir, cache, processes)
+        warm = scan_tree(workdir, cache, processes)
+        print(f"cold: {cold.files_per_sec:10.1f} files/sec ({len(cold.findings)} findings)")
+        print(f"warm: {warm.files_per_sec:10.1f} files/sec ({warm.cache_hits} cache hits)")
+
+
+if __name__ == "__main__":
+    mismatches = check_golden_corpus()
+    print("Golden corpus:", "OK" if not mismatches else mismatches)
+    benchmark_tree()
@@ -0,0 +1,54 @@
+# test_calc_history.py
+# Running min/max/sum checks for RingHistory, including NaN values
+
+import math
+
+from calc_history import RingHistory
+
+
+def test_extrema_skip_nan():
+    history = RingHistory(capacity=3)
+    history.extend([1.0, math.nan, 0.5])
+    assert history.min == 0.5
+    assert history.max == 1.0
+    assert math.isnan(history.sum)
+
+
+def test_extrema_after_nan_is_evicted():
+    history = RingHistory(capacity=2)
+    history.extend([math.nan, 3.0, 2.0])
+    assert list(history) == [3.0, 2.0]
+    assert (history.min, history.max, history.sum) == (2.0, 3.0, 5.0)
+
+
+def test_only_nan_has_no_extrema():
+    history = RingHistory(capacity=2)
+    history.extend([math.nan, math.nan])
+    assert history.min is None and history.max is None
+
+
+def test_window_matches_brute_force():
+    values = [5.0, -1.0, math.nan, 7.0, 7.0, -3.0, math.inf, 2.0, math.nan, 0.0, -math.inf, 4.0]
+    history = RingHistory(capacity=4)
+    for i, value in enumerate(values):
+        history.append(value)
+        window = [v for v in values[max(0, i - 3):i + 1] if not math.isnan(v)]
+        assert history.min == (min(window) if window else None)
+        assert history.max == (max(window) if window else None)
+
+
+def test_reopened_history_rebuilds_extrema(tmp_path):
+    path = str(tmp_path / 'history.bin')
+    with RingHistory(capacity=3, path=path) as history:
+        history.extend([1.0, math.nan, 0.5, 2.0])
+    with RingHistory(capacity=3, path=path) as reopened:
+        assert math.isnan(reopened.sum)
+        assert (reopened.min, reopened.max) == (0.5, 2.0)
+
+
+def test_sum_recovers_when_infinities_leave_the_window():
+    history = RingHistory(capacity=3)
+    history.extend([math.inf, -math.inf, 1.0])
+    assert math.isnan(history.sum)
+    history.extend([2.0, 3.0])
+    assert history.sum == 6.0
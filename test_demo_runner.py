@@ -0,0 +1,42 @@
+# test_demo_runner.py
+# Timeout and shutdown checks for demo_runner with a demonstration that never returns
+
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import demo_runner
+from error_code import PythonErrorDemonstrator
+
+HANG_SCRIPT = """
+import threading
+import demo_runner
+from error_code import PythonErrorDemonstrator
+PythonErrorDemonstrator.demonstrate_hang = lambda self: threading.Event().wait()
+print(demo_runner.run_demonstrations(0.2, demonstrations=[('Hang', 'demonstrate_hang')])[0].status)
+"""
+
+
+def test_hanging_demo_times_out(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(PythonErrorDemonstrator, 'demonstrate_hang', lambda self: release.wait() and [], raising=False)
+    try:
+        start = time.perf_counter()
+        results = demo_runner.run_demonstrations(
+            0.2, demonstrations=[('Hang', 'demonstrate_hang'), ("Arithmetic Errors", 'demonstrate_arithmetic_errors')])
+        assert time.perf_counter() - start < 5
+        assert [r.status for r in results] == ['timeout', 'ok']
+        assert results[1].errors
+        abandoned = [t for t in threading.enumerate() if t.name.startswith('demo_') and t.is_alive()]
+        assert abandoned and all(t.daemon for t in abandoned)
+    finally:
+        release.set()
+
+
+def test_hanging_demo_does_not_block_exit():
+    completed = subprocess.run([sys.executable, '-c', HANG_SCRIPT], capture_output=True, text=True, timeout=30,
+                               cwd=os.path.dirname(os.path.abspath(demo_runner.__file__)))
+    assert completed.returncode == 0, completed.stderr
+    assert completed.stdout.strip() == 'timeout'
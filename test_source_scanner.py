@@ -0,0 +1,50 @@
+# test_source_scanner.py
+# Golden-corpus and cache checks for source_scanner
+
+import source_scanner
+from source_scanner import Finding, ScanCache, check_golden_corpus
+
+
+def test_golden_corpus_rule_counts():
+    assert check_golden_corpus() == {}
+
+
+def test_scan_cache_round_trip(tmp_path):
+    path = str(tmp_path / 'cache.json')
+    cache = ScanCache(path)
+    cache.put('digest', [Finding('a.py', 3, 4, 'eval-exec', 'eval/exec of dynamic code')])
+    cache.save()
+
+    reloaded = ScanCache(path)
+    assert reloaded.get('digest', 'b.py') == [Finding('b.py', 3, 4, 'eval-exec', 'eval/exec of dynamic code')]
+
+
+def test_scan_cache_dropped_when_rules_change(tmp_path, monkeypatch):
+    path = str(tmp_path / 'cache.json')
+    cache = ScanCache(path)
+    cache.put('digest', [])
+    cache.save()
+
+    monkeypatch.setattr(source_scanner, 'ruleset_digest', lambda: 'other rules')
+    assert len(ScanCache(path)) == 0
+
+
+def test_scan_cache_ignores_corrupt_file(tmp_path):
+    path = tmp_path / 'cache.json'
+    path.write_text('{"ruleset": "trunc')
+    cache = ScanCache(str(path))
+    assert len(cache) == 0
+    cache.put('digest', [])
+    cache.save()
+    assert len(ScanCache(str(path))) == 1
+
+
+def test_scan_paths_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(source_scanner, '_BATCH_BYTES', 1)
+    paths = []
+    for n in range(3):
+        path = tmp_path / f'm{n}.py'
+        path.write_text(f'eval(x{n})\n')
+        paths.append(str(path))
+    result = source_scanner.scan_paths(paths, processes=1)
+    assert [finding.path for finding in result.findings] == paths
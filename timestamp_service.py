@@ -0,0 +1,113 @@
+# timestamp_service.py
+# Cached UTC ISO-8601 timestamps (replacement for BuggyDateTimeHandler.get_current_timestamp)
+
+import datetime
+import math
+import time
+from typing import Callable, Iterable, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; format_many falls back to the cached formatter
+    np = None
+
+_UTC = datetime.timezone.utc
+_NS_PER_SECOND = 1_000_000_000
+
+
+def _render_prefix(second: int) -> str:
+    return datetime.datetime.fromtimestamp(second, _UTC).strftime('%Y-%m-%dT%H:%M:%S')
+
+
+class TimestampService:
+    """Formats ``YYYY-MM-DDTHH:MM:SS.ffffff+00:00`` strings, rendering the date part once per second.
+
+    In ``monotonic`` mode the wall clock is read only at resync points; in
+    between, time is the anchor plus elapsed ``time.monotonic_ns()``, which
+    also guarantees timestamps never go backwards between resyncs.
+    """
+
+    def __init__(self, monotonic: bool = False, resync_interval: float = 1.0,
+                 wall_clock: Callable[[], int] = time.time_ns):
+        self.monotonic = monotonic
+        self.resync_interval_ns = int(resync_interval * _NS_PER_SECOND)
+        self._wall_clock = wall_clock
+        self._cache = (0, 0, '')        # (second start ns, next second ns, 'prefix.'); replaced as a whole
+        self._anchor = (0, 0)           # (wall ns, monotonic ns)
+        if monotonic:
+            self.resync()
+
+    def resync(self) -> None:
+        """Re-anchor monotonic mode to the wall clock."""
+        self._anchor = (self._wall_clock(), time.monotonic_ns())
+
+    def now_ns(self) -> int:
+        if not self.monotonic:
+            return self._wall_clock()
+        wall, mono = self._anchor
+        elapsed = time.monotonic_ns() - mono
+        if elapsed >= self.resync_interval_ns:
+            self.resync()
+            return self._anchor[0]
+        return wall + elapsed
+
+    def format_ns(self, epoch_ns: int) -> str:
+        low, high, prefix = self._cache
+        if not low <= epoch_ns < high:
+            second = epoch_ns // _NS_PER_SECOND
+            low = second * _NS_PER_SECOND
+            prefix = _render_prefix(second) + '.'
+            self._cache = (low, low + _NS_PER_SECOND, prefix)
+        return f"{prefix}{(epoch_ns - low) // 1000:06d}+00:00"
+
+    def now(self) -> str:
+        return self.format_ns(self._wall_clock() if not self.monotonic else self.now_ns())
+
+    def get_current_timestamp(self) -> str:
+        """Compatible with BuggyDateTimeHandler.get_current_timestamp, but always UTC."""
+        return self.now()
+
+    def format_many(self, epochs: Iterable[float]) -> List[str]:
+        """Format epoch seconds (floats or a NumPy array), truncated to microseconds."""
+        if np is not None:
+            micros = np.floor(np.asarray(epochs, dtype=np.float64) * 1e6).astype('datetime64[us]')
+            return [s + '+00:00' for s in np.datetime_as_string(micros, unit='us').tolist()]
+        return [self.format_ns(math.floor(epoch * 1e6) * 1000) for epoch in epochs]
+
+
+_default_service: Optional[TimestampService] = None
+
+
+def utc_timestamp() -> str:
+    """Current UTC time from a shared wall-clock service."""
+    global _default_service
+    if _default_service is None:
+        _default_service = TimestampService()
+    return _default_service.now()
+
+
+def benchmark_timestamps(calls: int = 1_000_000) -> None:
+    """Calls per second for the legacy method and both service modes."""
+    from buggy_code import BuggyDateTimeHandler
+
+    legacy = BuggyDateTimeHandler()
+    candidates = [
+        ('get_current_timestamp', legacy.get_current_timestamp),
+        ('TimestampService', TimestampService().now),
+        ('TimestampService(monotonic)', TimestampService(monotonic=True).now),
+    ]
+    for label, stamp in candidates:
+        start = time.perf_counter()
+        for _ in range(calls):
+            stamp()
+        print(f"{label:>28}: {calls / (time.perf_counter() - start):12,.0f} calls/sec")
+
+    epochs = [time.time() + i * 0.001 for i in range(calls)]
+    service = TimestampService()
+    start = time.perf_counter()
+    service.format_many(epochs)
+    print(f"{'format_many':>28}: {calls / (time.perf_counter() - start):12,.0f} stamps/sec")
+
+
+if __name__ == "__main__":
+    benchmark_timestamps()
@@ -0,0 +1,154 @@
+# user_lookup.py
+# Batched, cached user summaries (replacement for BuggyCollections.get_user_info)
+
+import random
+import time
+from typing import Any, Dict, Hashable, Iterable, List, Mapping, NamedTuple, Optional, Sequence
+
+
+class LookupResult(NamedTuple):
+    results: Dict[Hashable, str]    # user_id -> "name - email", in request order
+    missing: List[Hashable]         # ids with no record
+    invalid: List[Hashable]         # ids whose record lacks a name or email
+
+
+def format_user(user: Mapping[str, Any]) -> str:
+    return f"{user['name']} - {user['email']}"
+
+
+def format_users(users: Mapping, user_ids: Iterable[Hashable]) -> LookupResult:
+    """Resolve and format a page of ids in one pass, without a cache and without raising.
+
+    Each id is reported once, however often it repeats in ``user_ids``.
+    """
+    results: Dict[Hashable, str] = {}
+    missing: List[Hashable] = []
+    invalid: List[Hashable] = []
+    seen = set()
+    get = users.get
+    for user_id in user_ids:
+        if user_id in seen:
+            continue
+        seen.add(user_id)
+        user = get(user_id)
+        if user is None:
+            missing.append(user_id)
+            continue
+        try:
+            results[user_id] = format_user(user)
+        except (KeyError, TypeError):
+            invalid.append(user_id)
+    return LookupResult(results, missing, invalid)
+
+
+class UserDirectory:
+    """User records plus a cache of their formatted summaries.
+
+    Writes must go through ``set_user``/``update_user``/``remove_user`` so the
+    cached string of the changed user is dropped; records mutated behind the
+    directory's back keep their stale summary until ``invalidate`` is called.
+    """
+
+    def __init__(self, users: Optional[Mapping] = None):
+        self._users: Dict[Hashable, Dict[str, Any]] = dict(users or {})
+        self._formatted: Dict[Hashable, str] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._users)
+
+    def __contains__(self, user_id):
+        return user_id in self._users
+
+    def get(self, user_id: Hashable) -> Optional[Dict[str, Any]]:
+        return self._users.get(user_id)
+
+    def set_user(self, user_id: Hashable, record: Mapping[str, Any]) -> None:
+        self._users[user_id] = dict(record)
+        self._formatted.pop(user_id, None)
+
+    def update_user(self, user_id: Hashable, **fields) -> None:
+        self._users[user_id].update(fields)
+        self._formatted.pop(user_id, None)
+
+    def remove_user(self, user_id: Hashable) -> None:
+        del self._users[user_id]
+        self._formatted.pop(user_id, None)
+
+    def invalidate(self, user_id: Optional[Hashable] = None) -> None:
+        """Drop one cached summary, or all of them."""
+        if user_id is None:
+            self._formatted.clear()
+        else:
+            self._formatted.pop(user_id, None)
+
+    def get_user_info(self, user_id: Hashable) -> Optional[str]:
+        """Single-id form; None instead of KeyError when the user is missing or incomplete."""
+        page = self.lookup_many((user_id,))
+        return page.results.get(user_id)
+
+    def lookup_many(self, user_ids: Sequence[Hashable]) -> LookupResult:
+        """Summaries for a page of ids, served from the cache where possible."""
+        formatted = self._formatted
+        get = formatted.get
+        # Cold ids map to None for now, which also holds their request-order slot
+        results = {user_id: get(user_id) for user_id in user_ids}
+        missing: List[Hashable] = []
+        invalid: List[Hashable] = []
+        cold = [user_id for user_id, text in results.items() if text is None]
+        self.hits += len(results) - len(cold)
+        if cold:
+            page = format_users(self._users, cold)
+            self.misses += len(cold)           # every id not served from the cache, found or not
+            formatted.update(page.results)
+            results.update(page.results)
+            for user_id in page.missing:
+                del results[user_id]
+            for user_id in page.invalid:
+                del results[user_id]
+            missing, invalid = page.missing, page.invalid
+        return LookupResult(results, missing, invalid)
+
+
+def benchmark_lookup(users_count: int = 100_000, pages: int = 2_000, page_size: int = 50) -> None:
+    """Ids per second: per-id get_user_info calls versus batched, cached pages."""
+    from buggy_code import BuggyCollections
+
+    rng = random.Random(8)
+    users = {i: {'name': f"user{i}", 'email': f"user{i}@example.com"} for i in range(users_count)}
+    hot = list(range(5_000))
+    requests = [[rng.choice(hot) if rng.random() < 0.9 else rng.randrange(users_count + 1_000)
+                 for _ in range(page_size)] for _ in range(pages)]
+    total = pages * page_size
+
+    legacy = BuggyCollections()
+    start = time.perf_counter()
+    for page in requests:
+        rendered, missing = {}, []      # what a caller has to collect per page
+        for user_id in page:
+            try:
+                rendered[user_id] = legacy.get_user_info(users, user_id)
+            except KeyError:
+                missing.append(user_id)
+    per_id = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for page in requests:
+        format_users(users, page)
+    batched = time.perf_counter() - start
+
+    directory = UserDirectory(users)
+    start = time.perf_counter()
+    for page in requests:
+        directory.lookup_many(page)
+    cached = time.perf_counter() - start
+
+    print(f"get_user_info per id: {total / per_id:12,.0f} ids/sec")
+    print(f"format_users        : {total / batched:12,.0f} ids/sec")
+    print(f"UserDirectory       : {total / cached:12,.0f} ids/sec "
+          f"(hit ratio {directory.hits / (directory.hits + directory.misses):.2%})")
+
+
+if __name__ == "__main__":
+    benchmark_lookup()
@@ -0,0 +1,201 @@
+# user_store.py
+# Columnar, bounded user store with O(1) lookups (replacement for code_quality_issue.user_manager)
+
+import operator
+import sys
+import time
+from array import array
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+EVICTION_POLICIES = ('lru', 'fifo', 'reject')
+MAX_AGE = 0xFFFF                # ages are stored as unsigned 16-bit
+_ID_RANGE = (-(1 << 63), (1 << 63) - 1)
+
+
+class StoreFullError(Exception):
+    """Raised when adding to a full store whose eviction policy is 'reject'."""
+
+
+class UserRecord:
+    """Lightweight user value without a per-instance ``__dict__``."""
+
+    __slots__ = ('id', 'name', 'age', 'email')
+
+    def __init__(self, id: int, name: str, age: int, email: str):
+        self.id = id
+        self.name = name
+        self.age = age
+        self.email = email
+
+    def __repr__(self):
+        return f"UserRecord(id={self.id!r}, name={self.name!r}, age={self.age!r}, email={self.email!r})"
+
+    def __eq__(self, other):
+        if not isinstance(other, UserRecord):
+            return NotImplemented
+        return (self.id, self.name, self.age, self.email) == (other.id, other.name, other.age, other.email)
+
+
+class UserStore:
+    """Users kept in parallel columns with an id -> row index.
+
+    Holds at most ``capacity`` users; when full, the least recently used
+    ('lru') or oldest ('fifo') user is evicted, or StoreFullError is raised
+    ('reject').
+    """
+
+    def __init__(self, capacity: int = 100, eviction: str = 'lru'):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if eviction not in EVICTION_POLICIES:
+            raise ValueError(f"eviction must be one of {EVICTION_POLICIES}")
+        self.capacity = capacity
+        self.eviction = eviction
+        self._ids = array('q')
+        self._ages = array('H')
+        self._names = []
+        self._emails = []
+        self._index: "OrderedDict[int, int]" = OrderedDict()
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, user_id: int):
+        return user_id in self._index
+
+    def _remove_row(self, row: int) -> None:
+        # Swap-remove keeps the columns dense: the last row moves into the hole
+        last = len(self._ids) - 1
+        if row != last:
+            moved_id = self._ids[last]
+            self._ids[row] = moved_id
+            self._ages[row] = self._ages[last]
+            self._names[row] = self._names[last]
+            self._emails[row] = self._emails[last]
+            self._index[moved_id] = row
+        self._ids.pop()
+        self._ages.pop()
+        self._names.pop()
+        self._emails.pop()
+
+    @staticmethod
+    def _checked(user_id, age) -> Tuple[int, int]:
+        # Converted before anything is evicted or written, so a bad row leaves the store untouched
+        user_id = operator.index(user_id)
+        age = operator.index(age)
+        if not _ID_RANGE[0] <= user_id <= _ID_RANGE[1]:
+            raise ValueError(f"user id {user_id} does not fit in 64 bits")
+        if not 0 <= age <= MAX_AGE:
+            raise ValueError(f"age must be between 0 and {MAX_AGE}, got {age}")
+        return user_id, age
+
+    def add(self, user_id: int, name: str, age: int, email: str) -> None:
+        """Insert or update one user, evicting if the store is full.
+
+        Raises TypeError or ValueError, without changing the store, when
+        the id or age is not an integer in range.
+        """
+        user_id, age = self._checked(user_id, age)
+        row = self._index.get(user_id)
+        if row is not None:
+            self._ages[row] = age
+            self._names[row] = name
+            self._emails[row] = email
+            if self.eviction == 'lru':
+                self._index.move_to_end(user_id)
+            return
+        if len(self._ids) >= self.capacity:
+            if self.eviction == 'reject':
+                raise StoreFullError(f"User store is full ({self.capacity} users)")
+            _, evicted_row = self._index.popitem(last=False)
+            self._remove_row(evicted_row)
+            self.evictions += 1
+        self._index[user_id] = len(self._ids)
+        self._ids.append(user_id)
+        self._ages.append(age)
+        self._names.append(name)
+        self._emails.append(email)
+
+    def add_user(self, user) -> None:
+        """Insert any object exposing ``id``, ``name``, ``age`` and ``email``."""
+        self.add(user.id, user.name, user.age, user.email)
+
+    def bulk_add(self, rows: Iterable[Tuple[int, str, int, str]]) -> int:
+        """Insert many ``(id, name, age, email)`` rows; returns how many were processed."""
+        count = 0
+        add = self.add
+        for user_id, name, age, email in rows:
+            add(user_id, name, age, email)
+            count += 1
+        return count
+
+    def get_user(self, user_id: int) -> Optional[UserRecord]:
+        row = self._index.get(user_id)
+        if row is None:
+            return None
+        if self.eviction == 'lru':
+            self._index.move_to_end(user_id)
+        return UserRecord(user_id, self._names[row], self._ages[row], self._emails[row])
+
+    def remove(self, user_id: int) -> bool:
+        row = self._index.pop(user_id, None)
+        if row is None:
+            return False
+        self._remove_row(row)
+        return True
+
+    def memory_report(self) -> Dict[str, float]:
+        """Approximate bytes held by each structure, plus a per-million-users projection."""
+        report = {
+            'ids': sys.getsizeof(self._ids),
+            'ages': sys.getsizeof(self._ages),
+            'names': sys.getsizeof(self._names) + sum(map(sys.getsizeof, self._names)),
+            'emails': sys.getsizeof(self._emails) + sum(map(sys.getsizeof, self._emails)),
+            # Keys are boxed ids and values boxed row numbers, neither shared with the arrays
+            'index': (sys.getsizeof(self._index) + sum(map(sys.getsizeof, self._index))
+                      + sum(map(sys.getsizeof, self._index.values()))),
+        }
+        report['total'] = sum(report.values())
+        report['bytes_per_million_users'] = report['total'] / len(self) * 1_000_000 if len(self) else 0.0
+        return report
+
+
+def benchmark_store(users: int = 1_000_000, lookups: int = 100_000) -> None:
+    """Compare lookups and memory with code_quality_issue.user_manager / badClassName."""
+    from code_quality_issue import badClassName, user_manager
+
+    rows = [(i, f"User {i}", 20 + i % 60, f"user{i}@example.com") for i in range(users)]
+    store = UserStore(capacity=users)
+    start = time.perf_counter()
+    store.bulk_add(rows)
+    print(f"bulk_add: {users / (time.perf_counter() - start):,.0f} users/sec")
+
+    start = time.perf_counter()
+    for i in range(lookups):
+        store.get_user((i * 7919) % users)
+    print(f"UserStore.get_user: {lookups / (time.perf_counter() - start):,.0f} lookups/sec")
+
+    reference = user_manager()
+    sample = 10_000
+    for user_id, name, age, email in rows[:sample]:
+        user = badClassName(name, age, email)
+        user.id = user_id
+        reference.AddUser(user)
+    start = time.perf_counter()
+    for i in range(200):
+        reference.getUser((i * 7919) % sample)
+    print(f"user_manager.getUser ({sample} users): {200 / (time.perf_counter() - start):,.0f} lookups/sec")
+
+    report = store.memory_report()
+    legacy = badClassName("User 1", 30, "user1@example.com")
+    legacy.id = 1
+    per_legacy = sys.getsizeof(legacy) + sys.getsizeof(legacy.__dict__) + sys.getsizeof(legacy._private_var)
+    per_legacy += sys.getsizeof(legacy.name) + sys.getsizeof(legacy.email) + 8  # list slot
+    print(f"UserStore: {report['bytes_per_million_users'] / 2**20:.1f} MiB per million users")
+    print(f"badClassName list: {per_legacy * 1_000_000 / 2**20:.1f} MiB per million users")
+
+
+if __name__ == "__main__":
+    benchmark_store()